@@ -187,7 +187,7 @@ class ChartDataBuilder:
         Returns context dict ready for template rendering.
         """
         context = {
-            'chart_data_json': '',
+            'chart_data': {},
             'overall_months': [],
             'overall_historical': [],
             'overall_predicted': [],
@@ -217,8 +217,7 @@ class ChartDataBuilder:
         context['ingredient_chart_data'] = ingredient_chart_data
         context['ingredients_list'] = ingredients_list
         
-        # Build JSON for JavaScript
-        import json
+        # Chart payload for JavaScript (embedded with the json_script template filter)
         chart_data_for_js = {
             'overall': {
                 'months': context['overall_months'],
@@ -228,7 +227,7 @@ class ChartDataBuilder:
             'ingredients': ingredient_chart_data,
             'ingredients_list': ingredients_list
         }
-        context['chart_data_json'] = json.dumps(chart_data_for_js)
+        context['chart_data'] = chart_data_for_js
         
         return context
 
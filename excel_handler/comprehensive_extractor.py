@@ -8,6 +8,9 @@ import numpy as np
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 from collections import OrderedDict
+
+from .universal_extractor import EXCEL_READ_ENGINE
+
 # openpyxl imported only when needed to prevent startup issues
 # import openpyxl
 # from openpyxl import load_workbook
@@ -246,7 +249,7 @@ def extract_all_sheets_data(file_path: str) -> Dict[str, Any]:
     }
     
     try:
-        excel_file = pd.ExcelFile(file_path)
+        excel_file = pd.ExcelFile(file_path, engine=EXCEL_READ_ENGINE)
         result['summary']['total_sheets'] = len(excel_file.sheet_names)
         
         all_products_data = []
@@ -256,7 +259,7 @@ def extract_all_sheets_data(file_path: str) -> Dict[str, Any]:
         for sheet_name in excel_file.sheet_names:
             try:
                 logger.info(f"Processing sheet: {sheet_name}")
-                df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+                df = excel_file.parse(sheet_name, header=None)
                 
                 # Detect header row
                 header_row = detect_header_row(df)
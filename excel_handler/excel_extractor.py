@@ -5,10 +5,13 @@ Handles various Excel formats with proper header matching and data normalization
 import pandas as pd
 import numpy as np
 import logging
+import re
 from typing import Dict, List, Optional, Tuple, OrderedDict
 from datetime import datetime
 from collections import OrderedDict as OD
 
+from .universal_extractor import EXCEL_READ_ENGINE
+
 logger = logging.getLogger(__name__)
 
 # Month name mappings
@@ -34,6 +37,9 @@ FISCAL_MONTHS = ['April', 'May', 'June', 'July', 'August', 'September',
 # Column letters for fiscal months (D-O)
 MONTH_COLUMNS = ['D', 'E', 'F', 'G', 'H', 'I', 'J', 'K', 'L', 'M', 'N', 'O']
 
+# Sheet names containing 'workflow' (any case) and a '4', e.g. 'Workflow 4'
+WORKFLOW4_SHEET_PATTERN = re.compile(r'workflow.*4|4.*workflow', re.IGNORECASE)
+
 
 def normalize_month_name(value: str) -> Optional[str]:
     """
@@ -125,13 +131,18 @@ def extract_monthly_series(sheet: pd.DataFrame, product_code: str,
     product_lower = product_code.lower().strip()
     
     # Try to find product row by matching in first column
+    # (scan the column's values directly instead of building a Series per row)
+    if len(sheet.columns) > 0:
+        first_col_values = sheet.iloc[:, 0].tolist()
+    else:
+        first_col_values = [""] * len(sheet)
     product_row_idx = None
-    for idx, row in sheet.iterrows():
-        first_col_value = str(row.iloc[0]).lower().strip() if len(row) > 0 else ""
+    for pos, value in enumerate(first_col_values):
+        first_col_value = str(value).lower().strip()
         if product_lower in first_col_value or first_col_value in product_lower:
-            product_row_idx = idx
+            product_row_idx = sheet.index[pos]
             logger.debug("Found product '%s' at row %d: %s", 
-                        product_code, idx, str(row.iloc[0])[:50])
+                        product_code, product_row_idx, str(value)[:50])
             break
     
     if product_row_idx is None:
@@ -187,6 +198,11 @@ def extract_monthly_series(sheet: pd.DataFrame, product_code: str,
     return monthly_series
 
 
+def find_workflow4_sheet_name(sheet_names) -> Optional[str]:
+    """First sheet name that looks like the Workflow 4 sheet, or None."""
+    return next((name for name in sheet_names if WORKFLOW4_SHEET_PATTERN.search(name)), None)
+
+
 def extract_from_workflow4_sheet(excel_path: str, product_code: str) -> OrderedDict:
     """
     Extract monthly series from Workflow 4 sheet in processed Excel.
@@ -199,23 +215,40 @@ def extract_from_workflow4_sheet(excel_path: str, product_code: str) -> OrderedD
         OrderedDict with monthly data
     """
     try:
-        excel_file = pd.ExcelFile(excel_path)
+        excel_file = pd.ExcelFile(excel_path, engine=EXCEL_READ_ENGINE)
         
         # Try to find Workflow 4 sheet
         workflow4_sheet = None
-        for sheet_name in excel_file.sheet_names:
-            if 'workflow' in sheet_name.lower() and '4' in sheet_name:
-                workflow4_sheet = pd.read_excel(excel_path, sheet_name=sheet_name)
-                logger.debug("Found Workflow 4 sheet: %s", sheet_name)
-                break
+        sheet_name = find_workflow4_sheet_name(excel_file.sheet_names)
+        if sheet_name is not None:
+            workflow4_sheet = excel_file.parse(sheet_name)
+            logger.debug("Found Workflow 4 sheet: %s", sheet_name)
         
         if workflow4_sheet is None:
             logger.warning("Workflow 4 sheet not found in %s", excel_path)
             return OD()
         
         # Extract from the sheet
-        return extract_monthly_series(workflow4_sheet, product_code, "Workflow 4")
+        return extract_from_workflow4_frame(workflow4_sheet, product_code)
+    
+    except Exception as e:
+        logger.error("Error extracting from Workflow 4 sheet: %s", str(e))
+        return OD()
+
+
+def extract_from_workflow4_frame(workflow4_sheet: pd.DataFrame, product_code: str) -> OrderedDict:
+    """
+    Extract monthly series from an already-loaded Workflow 4 sheet.
+    
+    Args:
+        workflow4_sheet: Workflow 4 sheet DataFrame
+        product_code: Product identifier
     
+    Returns:
+        OrderedDict with monthly data (empty on error)
+    """
+    try:
+        return extract_monthly_series(workflow4_sheet, product_code, "Workflow 4")
     except Exception as e:
         logger.error("Error extracting from Workflow 4 sheet: %s", str(e))
         return OD()
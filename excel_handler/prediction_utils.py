@@ -122,6 +122,35 @@ def predict_next_months(values: List[float], num_months: int = 3, method: str =
     return predictions
 
 
+def predict_next_months_batch(totals_by_name: Dict[str, Dict[str, float]],
+                              num_months: int = 6, window: int = 3) -> Dict[str, List[float]]:
+    """
+    Moving-average predictions for several series at once.
+    Same result as predict_next_months(values, num_months, 'moving_average') for the
+    fiscal-ordered values of each series, computed as one NumPy pass over a (K, 12) array.
+    
+    Returns:
+        Dictionary {name: [predicted values]}
+    """
+    if not totals_by_name:
+        return {}
+    
+    names = list(totals_by_name)
+    totals = np.array(
+        [[totals_by_name[name].get(month, 0.0) for month in FISCAL_MONTHS] for name in names],
+        dtype=np.float64,
+    )
+    positive = totals > 0
+    # Number of positive values at or after each position; keep the last `window` of them
+    remaining = np.cumsum(positive[:, ::-1], axis=1)[:, ::-1]
+    take = positive & (remaining <= window)
+    counts = take.sum(axis=1)
+    sums = np.where(take, totals, 0.0).sum(axis=1)
+    averages = np.divide(sums, counts, out=np.zeros(len(names)), where=counts > 0)
+    
+    return {name: [float(avg)] * num_months for name, avg in zip(names, averages)}
+
+
 def generate_forecast_data(monthly_totals: Dict[str, float], num_future_months: int = 6) -> Dict:
     """
     Generate forecast data including historical and predicted values.
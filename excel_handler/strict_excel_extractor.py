@@ -10,6 +10,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from collections import OrderedDict
 import json
 
+from .universal_extractor import EXCEL_READ_ENGINE
+
 logger = logging.getLogger(__name__)
 
 # Month name normalization
@@ -116,7 +118,7 @@ def validate_excel_structure(file_path: str) -> Dict[str, Any]:
     }
     
     try:
-        excel_file = pd.ExcelFile(file_path)
+        excel_file = pd.ExcelFile(file_path, engine=EXCEL_READ_ENGINE)
         result['detected_sheets'] = excel_file.sheet_names
         
         if len(excel_file.sheet_names) == 0:
@@ -128,7 +130,7 @@ def validate_excel_structure(file_path: str) -> Dict[str, Any]:
         # Try to detect products and monthly data in each sheet
         for sheet_name in excel_file.sheet_names:
             try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+                df = excel_file.parse(sheet_name, header=None)
                 
                 # Check for month columns
                 has_months = False
@@ -435,7 +437,7 @@ def extract_strict_excel_data(file_path: str) -> Dict[str, Any]:
     }
     
     try:
-        excel_file = pd.ExcelFile(file_path)
+        excel_file = pd.ExcelFile(file_path, engine=EXCEL_READ_ENGINE)
         all_products_data = []
         overall_monthly_totals = {}
         
@@ -443,9 +445,9 @@ def extract_strict_excel_data(file_path: str) -> Dict[str, Any]:
         if len(excel_file.sheet_names) == 1:
             try:
                 # Import here to avoid circular import
-                from excel_handler.views import parse_excel_regions
-                df = pd.read_excel(file_path, sheet_name=excel_file.sheet_names[0], header=None)
-                df.columns = [chr(65 + i) for i in range(len(df.columns))]
+                from excel_handler.views import column_letters, parse_excel_regions
+                df = excel_file.parse(excel_file.sheet_names[0], header=None)
+                df.columns = column_letters(len(df.columns))
                 single_sheet_data = extract_from_single_sheet_structure(df, parse_excel_regions)
                 all_products_data.extend(single_sheet_data['products'])
                 for month_name, value in single_sheet_data['overall_monthly_totals'].items():
@@ -459,7 +461,7 @@ def extract_strict_excel_data(file_path: str) -> Dict[str, Any]:
         # Process each sheet (multi-sheet structure)
         for sheet_name in excel_file.sheet_names:
             try:
-                df = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
+                df = excel_file.parse(sheet_name, header=None)
                 
                 # Detect month columns
                 month_columns = detect_month_columns(df)
@@ -94,3 +94,25 @@ def test_normalize_numeric_value():
     assert normalize_numeric_value('') is None
     assert normalize_numeric_value('-') is None
 
+
+def test_predict_next_months_batch_matches_single_series():
+    """Test batch predictions equal the per-series moving average."""
+    from excel_handler.prediction_utils import (
+        FISCAL_MONTHS as PRED_MONTHS,
+        predict_next_months,
+        predict_next_months_batch,
+    )
+
+    series = {
+        'A': [100.0, 0.0, 120.0, 0.0, 130.0, 90.0] + [0.0] * 6,
+        'B': [0.0] * 11 + [50.0],
+        'C': [0.0] * 12,
+        'D': [10.0, 20.0] + [0.0] * 10,
+    }
+    totals = {name: dict(zip(PRED_MONTHS, values)) for name, values in series.items()}
+
+    batch = predict_next_months_batch(totals, 6)
+
+    for name, values in series.items():
+        expected = predict_next_months([v for v in values if v > 0], 6, 'moving_average')
+        assert batch[name] == pytest.approx(expected)
@@ -0,0 +1,83 @@
+"""
+Unit tests for the universal extractor.
+"""
+import os
+
+import pandas as pd
+from excel_handler.universal_extractor import (
+    detect_product_blocks,
+    extract_monthly_values_for_product,
+    load_sheets,
+)
+
+
+def test_detect_product_blocks_returns_parallel_arrays():
+    """Test product codes and their start rows are returned side by side."""
+    df = pd.DataFrame({
+        0: ['Title', 'MCT360', None, 'mct165 total'],
+        1: [None, None, None, None],
+    })
+
+    blocks = detect_product_blocks(df)
+
+    assert 'MCT360' in blocks.codes
+    assert 'MCT165' in blocks.codes
+    assert int(blocks.rows[blocks.codes.index('MCT360')]) == 1
+    assert int(blocks.rows[blocks.codes.index('MCT165')]) == 3
+    assert len(blocks) == len(blocks.rows) == len(blocks.columns)
+
+
+def test_extract_monthly_values_numeric_column():
+    """Test numeric month columns are summed and NaN-only months are None."""
+    df = pd.DataFrame({
+        0: ['MCT360', None, None],
+        1: [10.0, 20.0, None],
+        2: [None, None, None],
+    })
+    df[2] = df[2].astype(float)
+
+    result = extract_monthly_values_for_product(df, 0, {'April': 1, 'May': 2})
+
+    assert result['April'] == 30.0
+    assert isinstance(result['April'], float)
+    assert result['May'] is None
+
+
+def test_load_sheets_is_cached_until_file_changes(tmp_path):
+    """Test an unchanged workbook is parsed once and re-read after it changes."""
+    path = tmp_path / 'book.xlsx'
+    pd.DataFrame({'A': [1, 2]}).to_excel(path, index=False, header=False)
+
+    first = load_sheets(str(path))
+    assert load_sheets(str(path)) is first
+
+    pd.DataFrame({'A': [1, 2, 3]}).to_excel(path, index=False, header=False)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = load_sheets(str(path))
+    assert second is not first
+    assert len(next(iter(second.values()))) == 3
+
+
+def test_detect_product_blocks_strict_known_only():
+    """Test strict mode skips auto-detected codes and stops once all known products are found."""
+    from excel_handler.universal_extractor import KNOWN_PRODUCTS
+
+    df = pd.DataFrame({0: ['Title'] + KNOWN_PRODUCTS + ['EXTRA1']})
+
+    blocks = detect_product_blocks(df, strict_known_only=True)
+
+    assert blocks.codes == KNOWN_PRODUCTS
+    assert 'TITLE' not in blocks.codes
+
+
+def test_match_known_product_matches_substring_in_both_directions():
+    """Test known products match when contained in the cell or containing it."""
+    from excel_handler.universal_extractor import match_known_product
+
+    assert match_known_product('MCT360') == 'MCT360'
+    assert match_known_product('MCT165 TOTAL') == 'MCT165'
+    assert match_known_product('TICK30') == 'MCTSTICK30'
+    assert match_known_product('MCT') == 'MCT360'  # first product in list order
+    assert match_known_product('XYZ') is None
@@ -0,0 +1,47 @@
+"""
+View tests for the upload pages.
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blast_project.settings')
+django.setup()
+
+import pandas as pd
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from excel_handler.models import ProcessedData
+
+
+@pytest.fixture(scope='module')
+def test_db():
+    """Run the module against a throwaway test database."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    yield
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
+
+
+def test_index_blanks_empty_date_cells(test_db, tmp_path):
+    """Test a date column with an empty cell renders and is stored as blank, not NaT."""
+    path = tmp_path / 'dates.xlsx'
+    pd.DataFrame({
+        0: [pd.Timestamp('2024-04-01'), pd.NaT],
+        1: [5, 7],
+    }).to_excel(path, index=False, header=False)
+    upload = SimpleUploadedFile('dates.xlsx', path.read_bytes())
+
+    with override_settings(MEDIA_ROOT=tmp_path / 'media'):
+        response = Client().post(reverse('index'), {'excel_file': upload})
+
+    assert response.status_code == 200
+    rows = ProcessedData.objects.latest('id').data
+    assert rows[1]['A'] == ''
+    assert rows[1]['B'] == 7
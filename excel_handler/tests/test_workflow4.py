@@ -0,0 +1,40 @@
+"""
+Unit tests for the workflow 4 input normalization helpers.
+"""
+import pandas as pd
+from excel_handler.workflow4 import (
+    _canonical_month,
+    _canonical_months,
+    _normalize_input_dataframe,
+)
+
+
+def test_canonical_months_matches_scalar_version():
+    """Test the vectorized month parser agrees with _canonical_month, full-width digits included."""
+    values = ['April', 'apr.', '11月', '４月', '１２', '004', '0', '13', 'Total', '']
+
+    result = _canonical_months(pd.Series(values))
+
+    assert [m if isinstance(m, str) else None for m in result] == [
+        _canonical_month(v) for v in values
+    ]
+    assert result.tolist()[3:5] == ['April', 'December']
+
+
+def test_wide_format_parses_text_demand_that_float_accepts():
+    """Test text demand cells such as '1_000' and full-width digits are kept, month labels are not."""
+    df = pd.DataFrame({
+        'Product': ['MCT360', 'MCT165'],
+        'Per Unit Consumption': [2.0, 3.0],
+        'April': ['1_000', '１,２００'],
+        'May': ['1,500', '5'],
+    })
+
+    result = _normalize_input_dataframe(df)
+
+    demand = dict(zip(zip(result['product'], result['month']), result['demand']))
+    assert demand == {
+        ('MCT360', 'April'): 1000.0,
+        ('MCT360', 'May'): 1500.0,
+        ('MCT165', 'April'): 1200.0,
+    }
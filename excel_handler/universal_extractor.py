@@ -8,11 +8,20 @@ import numpy as np
 import logging
 import os
 from typing import Dict, List, Optional, Any, Tuple
-from collections import OrderedDict
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
 import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Prefer the Rust-backed calamine reader when python-calamine is installed
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_READ_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_READ_ENGINE = None  # pandas default (openpyxl)
+
 # Month name normalization
 MONTH_VARIANTS = {
     'jan': 'January', 'january': 'January', '01': 'January', '1': 'January',
@@ -40,6 +49,27 @@ FISCAL_MONTHS = ['April', 'May', 'June', 'July', 'August', 'September',
 KNOWN_PRODUCTS = ['MCT360', 'MCT165', 'MCTSTICK10', 'MCTSTICK30', 'MCTSTICK16', 'MCTITTO_C']
 
 
+def _build_known_substring_index() -> Dict[str, int]:
+    """Map every substring (length >= 2) of a known product to the index of the first product containing it."""
+    index: Dict[str, int] = {}
+    for idx, product in enumerate(KNOWN_PRODUCTS):
+        for start in range(len(product)):
+            for end in range(start + 2, len(product) + 1):
+                index.setdefault(product[start:end], idx)
+    return index
+
+
+_KNOWN_SUBSTRING_INDEX = _build_known_substring_index()
+
+# Single scan for "cell contains a known product"
+_KNOWN_PRODUCT_RE = re.compile('|'.join(re.escape(p) for p in KNOWN_PRODUCTS))
+
+# Parsed workbooks keyed by (abspath, st_mtime_ns, st_size, header), least recently used first
+_SHEET_CACHE: "OrderedDict[Tuple[str, int, int, Optional[int]], Dict[str, pd.DataFrame]]" = OrderedDict()
+_SHEET_CACHE_MAX_ENTRIES = 8
+_SHEET_CACHE_LOCK = threading.Lock()
+
+
 def to_float(value: Any) -> Optional[float]:
     """
     Convert value to pure Python float.
@@ -129,13 +159,47 @@ def detect_month_columns(df: pd.DataFrame, max_header_rows: int = 10) -> Dict[st
     return month_columns
 
 
-def detect_product_blocks(df: pd.DataFrame, start_row: int = 0) -> List[Dict[str, Any]]:
+def match_known_product(cell_str: str) -> Optional[str]:
+    """
+    Return the first KNOWN_PRODUCTS entry that is contained in cell_str or that
+    contains cell_str, or None. cell_str is expected to be stripped and upper-case.
+    """
+    best = _KNOWN_SUBSTRING_INDEX.get(cell_str)
+    if _KNOWN_PRODUCT_RE.search(cell_str):
+        limit = len(KNOWN_PRODUCTS) if best is None else best
+        for idx in range(limit):
+            if KNOWN_PRODUCTS[idx] in cell_str:
+                best = idx
+                break
+    return KNOWN_PRODUCTS[best] if best is not None else None
+
+
+@dataclass
+class ProductBlocks:
+    """
+    Detected product blocks stored as parallel arrays (one entry per product).
+    codes[i] starts at row rows[i], found in column columns[i].
+    """
+    codes: List[str] = field(default_factory=list)
+    rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    columns: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def detect_product_blocks(df: pd.DataFrame, start_row: int = 0,
+                          strict_known_only: bool = False) -> ProductBlocks:
     """
     Detect product blocks by looking for product codes.
     Specifically detects: MCT360, MCT165, MCTSTICK10, MCTSTICK30, MCTSTICK16, MCTITTO_C
-    Returns list of product info with row ranges.
+    With strict_known_only, product-like codes are not auto-detected and the
+    scan stops as soon as every known product has been found.
+    Returns ProductBlocks with the code, start row and column of each product.
     """
-    products = []
+    codes = []
+    rows = []
+    columns = []
     seen_codes = set()
     
     # Look in first 3 columns for product identifiers
@@ -150,38 +214,37 @@ def detect_product_blocks(df: pd.DataFrame, start_row: int = 0) -> List[Dict[str
                 continue
             
             # Check for exact or partial match with known products
-            matched_product = None
-            for known_product in KNOWN_PRODUCTS:
-                # Check if cell contains product code or vice versa
-                if known_product in cell_str or cell_str in known_product:
-                    matched_product = known_product
-                    break
+            matched_product = match_known_product(cell_str)
             
             # If matched a known product and not already seen
             if matched_product and matched_product not in seen_codes:
                 seen_codes.add(matched_product)
-                products.append({
-                    'code': matched_product,
-                    'row_index': row_idx,
-                    'name': cell_str,
-                    'column_index': col_idx
-                })
+                codes.append(matched_product)
+                rows.append(row_idx)
+                columns.append(col_idx)
+                if strict_known_only and len(seen_codes) >= len(KNOWN_PRODUCTS):
+                    return ProductBlocks(
+                        codes=codes,
+                        rows=np.asarray(rows, dtype=np.int32),
+                        columns=np.asarray(columns, dtype=np.int32),
+                    )
             # Also check for product-like codes (alphanumeric, contains letters)
-            elif matched_product is None:
+            elif matched_product is None and not strict_known_only:
                 has_letters = any(c.isalpha() for c in cell_str)
                 is_long_enough = len(cell_str) >= 2
                 not_pure_number = not cell_str.replace('.', '').replace('-', '').isdigit()
                 
                 if has_letters and is_long_enough and not_pure_number and cell_str not in seen_codes:
                     seen_codes.add(cell_str)
-                    products.append({
-                        'code': cell_str,
-                        'row_index': row_idx,
-                        'name': cell_str,
-                        'column_index': col_idx
-                    })
+                    codes.append(cell_str)
+                    rows.append(row_idx)
+                    columns.append(col_idx)
     
-    return products
+    return ProductBlocks(
+        codes=codes,
+        rows=np.asarray(rows, dtype=np.int32),
+        columns=np.asarray(columns, dtype=np.int32),
+    )
 
 
 def extract_monthly_values_for_product(df: pd.DataFrame, product_row: int,
@@ -198,12 +261,24 @@ def extract_monthly_values_for_product(df: pd.DataFrame, product_row: int,
     end_row = min(product_row + num_rows_to_check, len(df))
     
     for month_name, col_idx in month_columns.items():
+        if col_idx >= len(df.columns):
+            monthly_data[month_name] = None
+            continue
+        
+        # Numeric columns: sum the finite values directly, no per-cell conversion.
+        # Values stay float64 so the extracted totals match the workbook exactly.
+        column = df.iloc[product_row:end_row, col_idx]
+        if column.dtype.kind in 'fiu':
+            values = column.to_numpy(dtype=np.float64, copy=False)
+            finite = np.isfinite(values)
+            monthly_data[month_name] = (
+                float(np.sum(values, where=finite)) if finite.any() else None
+            )
+            continue
+        
         month_values = []
         
         for row_idx in range(product_row, end_row):
-            if col_idx >= len(df.columns):
-                continue
-            
             try:
                 cell_value = df.iloc[row_idx, col_idx]
                 num_value = to_float(cell_value)
@@ -224,14 +299,48 @@ def extract_monthly_values_for_product(df: pd.DataFrame, product_row: int,
     return monthly_data
 
 
+def load_sheets(file_path: str, header: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Read every sheet of the workbook as {sheet_name: DataFrame}.
+    Results are cached per file path, modification time, size and header row, so
+    repeated extraction of an unchanged upload does not re-parse the workbook.
+    The returned frames are shared between callers and must not be modified.
+    """
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size, header)
+    
+    with _SHEET_CACHE_LOCK:
+        sheets = _SHEET_CACHE.get(key)
+        if sheets is not None:
+            _SHEET_CACHE.move_to_end(key)
+            return sheets
+    
+    sheets = pd.read_excel(file_path, sheet_name=None, header=header, engine=EXCEL_READ_ENGINE)
+    
+    with _SHEET_CACHE_LOCK:
+        _SHEET_CACHE[key] = sheets
+        _SHEET_CACHE.move_to_end(key)
+        while len(_SHEET_CACHE) > _SHEET_CACHE_MAX_ENTRIES:
+            _SHEET_CACHE.popitem(last=False)
+    
+    return sheets
+
+
 class UniversalDataExtractor:
     """
     Universal Excel Data Extractor
     Extracts clean numeric data from ANY Excel file structure.
     """
     
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, strict_known_only: bool = False,
+                 sheets: Optional[Dict[str, pd.DataFrame]] = None):
+        """
+        sheets: already-parsed {sheet_name: DataFrame} (header=None) for file_path,
+        e.g. from load_sheets(); the workbook is read only when it is not given.
+        """
         self.file_path = file_path
+        self.strict_known_only = strict_known_only
+        self.sheets = sheets
         self.excel_file = None
         self.all_products_data = {}
         
@@ -249,15 +358,14 @@ class UniversalDataExtractor:
                     'overall': {'historical': {}, 'predicted': {}}
                 }
             
-            self.excel_file = pd.ExcelFile(self.file_path)
+            sheets = self.sheets if self.sheets is not None else load_sheets(self.file_path)
             all_products_data = {}
-            overall_monthly_totals = {}
+            overall_monthly_totals = Counter()
             
             # Process EVERY sheet
-            for sheet_name in self.excel_file.sheet_names:
+            for sheet_name, df in sheets.items():
                 try:
                     logger.info(f"Processing sheet: {sheet_name}")
-                    df = pd.read_excel(self.file_path, sheet_name=sheet_name, header=None)
                     
                     # Detect month columns
                     month_columns = detect_month_columns(df)
@@ -266,13 +374,14 @@ class UniversalDataExtractor:
                         continue
                     
                     # Detect product blocks
-                    products = detect_product_blocks(df, start_row=0)
-                    logger.info(f"Found {len(products)} products in sheet {sheet_name}")
+                    blocks = detect_product_blocks(
+                        df, start_row=0, strict_known_only=self.strict_known_only
+                    )
+                    logger.info(f"Found {len(blocks)} products in sheet {sheet_name}")
                     
                     # Extract data for each product
-                    for product in products:
-                        product_code = product['code']
-                        product_row = product['row_index']
+                    for i, product_code in enumerate(blocks.codes):
+                        product_row = int(blocks.rows[i])
                         
                         # Extract monthly values
                         monthly_data = extract_monthly_values_for_product(
@@ -300,32 +409,23 @@ class UniversalDataExtractor:
                             all_products_data[product_code]['historical'].update(historical_data)
                             all_products_data[product_code]['predicted'].update(predicted_data)
                             
-                            # Add to overall totals
-                            for month_name, value in historical_data.items():
-                                if month_name not in overall_monthly_totals:
-                                    overall_monthly_totals[month_name] = 0.0
-                                overall_monthly_totals[month_name] += float(value)
+                            # Add to overall totals (every sheet's occurrence counts)
+                            overall_monthly_totals.update(historical_data)
                 
                 except Exception as e:
                     logger.error(f"Error processing sheet {sheet_name}: {e}", exc_info=True)
                     continue
             
-            # Build result structure
+            # Build result structure (product data is already
+            # {code: {'historical': {month: float}, 'predicted': {month: float}}})
             result = {
-                'products': {},
+                'products': all_products_data,
                 'overall': {
                     'historical': {},
                     'predicted': {}
                 }
             }
             
-            # Convert product data to clean format
-            for product_code, data in all_products_data.items():
-                result['products'][product_code] = {
-                    'historical': data['historical'],  # {month: float_value}
-                    'predicted': data['predicted']     # {month: float_value}
-                }
-            
             # Calculate overall predictions
             if overall_monthly_totals:
                 overall_historical = {k: float(v) for k, v in overall_monthly_totals.items()}
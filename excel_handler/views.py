@@ -1,33 +1,40 @@
+import dataclasses
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import HttpResponse, JsonResponse
+from django.core.cache import cache
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
 import pandas as pd
 import json
 import io
+import hashlib
 import numpy as np
 import os
+import re
 
 from .models import ProcessedData, UploadedExcelFile
+from .prediction_utils import predict_next_months_batch
+from .universal_extractor import EXCEL_READ_ENGINE, load_sheets
 from .workflow4 import (
+    MONTH_INDEX,
     MONTH_NAMES, 
     Workflow4Result, 
     run_workflow4_pipeline,
     write_results_to_original_excel,
 )
-from .prediction_utils import (
-    extract_monthly_data_from_annual,
-    extract_monthly_data_from_ingredients,
-    calculate_monthly_totals,
-    generate_forecast_data,
-    prepare_chart_data,
-)
 from .excel_extractor import (
     extract_monthly_series,
-    extract_from_workflow4_sheet,
+    extract_from_workflow4_frame,
     extract_from_ingredient_section,
+    find_workflow4_sheet_name,
     normalize_month_name,
     normalize_numeric_value,
     FISCAL_MONTHS,
@@ -57,6 +64,56 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Stream downloads through xlsxwriter when it is installed
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# orjson is a faster drop-in for encoding the chart-data responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Excel column labels (A ... Z, AA ... ZZ) assigned to header-less sheets
+COL_LETTERS = tuple(get_column_letter(i) for i in range(1, 27 * 26 + 1))
+# Annual-data rows keep columns A-P, ingredient rows A-Q
+ANNUAL_COLS = frozenset(COL_LETTERS[:16])
+INGREDIENT_COLS = frozenset(COL_LETTERS[:17])
+
+
+def column_letters(count):
+    """Labels for the first `count` columns of a header-less sheet."""
+    if count <= len(COL_LETTERS):
+        return list(COL_LETTERS[:count])
+    return [get_column_letter(i) for i in range(1, count + 1)]
+
+
+# Parsed upload sheets stay in the Django cache for an hour
+UPLOAD_FRAME_CACHE_TIMEOUT = 3600
+UPLOAD_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def read_upload_frame(path):
+    """
+    Read the first sheet of an uploaded workbook with header=None.
+    The parsed DataFrame is cached by a hash of the file contents, so views touching
+    the same upload, and repeat uploads of the same workbook, do not parse it again.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(UPLOAD_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    key = f"xlsx:{digest.hexdigest()}"
+    df = cache.get(key)
+    if df is None:
+        df = pd.read_excel(path, header=None, engine=EXCEL_READ_ENGINE)
+        cache.set(key, df, UPLOAD_FRAME_CACHE_TIMEOUT)
+    return df
+
 def compare_files(df, sample_df):
     # Skeletal comparison function - always pass for now
     # TODO: Implement validation rules here
@@ -67,105 +124,77 @@ def index(request):
     annual_data = []
     ingredient_list = []
     uploaded_file = None
+    sheets = None
     error_message = None
     warning_message = None
-    forecast_data = None
-    chart_data_json = None
-    ingredient_charts_json = {}
-    ingredients_json = "[]"  # Default empty array for JavaScript
     
     if request.method == 'POST' and request.FILES.get('excel_file'):
         excel_file = request.FILES['excel_file']
         uploaded_file = UploadedExcelFile.objects.create(file=excel_file)
         try:
-            df = pd.read_excel(uploaded_file.file.path, header=None)
-            df.columns = [chr(65 + i) for i in range(len(df.columns))]
+            # Every sheet is parsed once here and shared with the chart extraction below
+            sheets = load_sheets(uploaded_file.file.path)
+            # Shallow copy: the cached frame is shared and must keep its own labels
+            df = next(iter(sheets.values())).copy(deep=False)
+            df.columns = column_letters(len(df.columns))
             # Parse the structure and assign regions
             regions = parse_excel_regions(df)
-            data = []
-            for i, row in df.iterrows():
-                row_dict = row.to_dict()
-                row_dict = {k: v if pd.notna(v) else "" for k, v in row_dict.items()}
-                region = regions.get(i, 'unknown')
-                row_dict['region'] = region
-                row_dict['original_row'] = i
-                data.append(row_dict)
+            # Object view first: where() would leave NaT in datetime columns
+            filled = df.astype(object).where(df.notna(), "")
+            region_arr = np.array([regions.get(i, 'unknown') for i in range(len(df))], dtype=object)
+            records = filled.to_dict(orient='records')
+            data = [
+                {**record, 'region': region, 'original_row': i}
+                for i, (record, region) in enumerate(zip(records, region_arr))
+            ]
             
-            annual_data = [{k: v for k, v in row.items() if k != 'region' and k <= 'P'} for row in data if row['region'] in ['annual_data', 'annual_separator']][1:]
-            # Assign set types for coloring
-            data_row_count = 0
-            for row in annual_data:
-                if all(v == "" for v in row.values()):
-                    row['set_type'] = 'separator'
-                else:
-                    if data_row_count < 5:
-                        row['set_type'] = 'previous'
-                    else:
-                        row['set_type'] = 'current'
-                    data_row_count += 1
+            # Row positions of every region from a single grouping pass
+            region_positions = df.groupby(region_arr, sort=False).indices
+            no_rows = np.empty(0, dtype=np.intp)
+            annual_rows = np.sort(np.concatenate([
+                region_positions.get('annual_data', no_rows),
+                region_positions.get('annual_separator', no_rows),
+            ]))
+            annual_cols = [col for col in filled.columns if col in ANNUAL_COLS]
+            annual_block = filled.iloc[annual_rows[1:]][annual_cols]
+            # Assign set types for coloring: blank rows separate sets, the first
+            # five data rows are the previous year and the rest the current one
+            is_blank = (annual_block == "").all(axis=1).to_numpy()
+            data_rows_before = np.cumsum(~is_blank) - ~is_blank
+            annual_data = annual_block.assign(set_type=np.where(
+                is_blank, 'separator', np.where(data_rows_before < 5, 'previous', 'current')
+            )).to_dict(orient='records')
             request.session['annual_data'] = annual_data
             
             # Extract ingredient data
             ingredients = ['mct360', 'mct165', 'mctstick10', 'mctstick30', 'mctstick16', 'mctitto_c']
-            ingredient_list = [(ing, []) for ing in ingredients]
-            for row in data:
-                region = row.get('region', 'unknown')
-                if region.startswith('ingredient_'):
-                    ing = region.split('_', 1)[1]
-                    for item in ingredient_list:
-                        if item[0] == ing:
-                             filtered_row = {k: v for k, v in row.items() if k != 'region' and k <= 'Q'}
-                             item[1].append(filtered_row)
-                             break
-            
-            # Remove trailing empty rows from each ingredient block
-            for item in ingredient_list:
-                rows = item[1]
-                while rows and all(rows[-1].get(col, "") == "" for col in ['C','D','E','F']):
-                    rows.pop()
-                # Assign set types for coloring
-                for i, row in enumerate(rows):
-                    if i == 0:
-                        row['set_type'] = 'header'
-                    elif 1 <= i <= 10:
-                        row['set_type'] = 'previous'
-                    elif i >= len(rows) - 10:
-                        row['set_type'] = 'current'
-                    else:
-                        row['set_type'] = 'separator'
+            ingredient_cols = [col for col in filled.columns if col in INGREDIENT_COLS]
+            trim_cols = [col for col in ['C', 'D', 'E', 'F'] if col in filled.columns]
+            ingredient_list = []
+            for ing in ingredients:
+                block = filled.iloc[region_positions.get(f'ingredient_{ing}', no_rows)][ingredient_cols]
+                # Drop trailing rows that are empty in C-F before building any dicts
+                non_empty = (
+                    (block[trim_cols] != "").any(axis=1).to_numpy()
+                    if trim_cols else np.zeros(len(block), dtype=bool)
+                )
+                last = np.flatnonzero(non_empty)
+                block = block.iloc[:last[-1] + 1] if last.size else block.iloc[:0]
+                # Assign set types for coloring by position within the block
+                position = np.arange(len(block))
+                block = block.assign(set_type=np.select(
+                    [position == 0, position <= 10, position >= len(block) - 10],
+                    ['header', 'previous', 'current'],
+                    default='separator',
+                ))
+                ingredient_list.append((ing, block.to_dict(orient='records')))
             
             # Check if we found any ingredient data
             has_ingredient_data = any(len(item[1]) > 0 for item in ingredient_list)
             if not has_ingredient_data:
                 warning_message = "Warning: The uploaded file does not match the expected structure. The file should contain ingredient sections (MCT360, MCT165, MCTSTICK10, MCTSTICK30, MCTSTICK16, MCTITTO_C) and annual data sections. Please download the sample file to see the expected format."
             
-            # Extract monthly data and generate predictions
-            monthly_data = None
-            ingredient_monthly_data = None
-            
-            if annual_data:
-                try:
-                    monthly_data = extract_monthly_data_from_annual(annual_data)
-                    monthly_totals = calculate_monthly_totals(monthly_data)
-                    forecast_data = generate_forecast_data(monthly_totals, num_future_months=6)
-                    chart_data = prepare_chart_data(monthly_totals, forecast_data)
-                    # Convert to JSON for template
-                    chart_data_json = json.dumps(chart_data)
-                except Exception as e:
-                    print(f"Error generating forecast: {str(e)}")
-            
-            if has_ingredient_data:
-                try:
-                    ingredient_monthly_data = extract_monthly_data_from_ingredients(ingredient_list)
-                    for ing_name, ing_monthly in ingredient_monthly_data.items():
-                        ing_totals = calculate_monthly_totals(ing_monthly)
-                        ing_forecast = generate_forecast_data(ing_totals, num_future_months=6)
-                        ing_chart_data = prepare_chart_data(ing_totals, ing_forecast)
-                        ingredient_charts_json[ing_name] = json.dumps(ing_chart_data)
-                except Exception as e:
-                    print(f"Error generating ingredient charts: {str(e)}")
-            
-            ProcessedData.objects.create(original_file=uploaded_file, data=json.loads(json.dumps(data, default=str)))
+            ProcessedData.objects.create(original_file=uploaded_file, data=to_json_compatible(data))
         except Exception as e:
             error_message = f"Error processing file: {str(e)}"
             logger.error("Error processing file: %s", str(e), exc_info=True)
@@ -175,15 +204,15 @@ def index(request):
     overall_historical = []
     overall_predicted = []
     ingredient_chart_data = {}
-    ingredients_json = "[]"  # Default empty array
     all_products_list = []
     
-    # Use Universal Extractor to get clean data from ALL sheets
-    chart_data_json = json.dumps({
+    # Use Universal Extractor to get clean data from ALL sheets.
+    # The template embeds this dict with json_script, so it is encoded once at render time.
+    chart_data_for_js = {
         'overall': {'months': [], 'historical': [], 'predicted': []},
         'ingredients': {},
         'ingredients_list': []
-    })
+    }
     
     if uploaded_file:
         try:
@@ -196,7 +225,7 @@ def index(request):
                 logger.info(f"Extracting data using Universal Extractor from: {file_path}")
                 
                 # Extract data
-                extractor = UniversalDataExtractor(file_path)
+                extractor = UniversalDataExtractor(file_path, sheets=sheets)
                 extracted_data = extractor.extract()
                 
                 # Build chart data
@@ -212,8 +241,7 @@ def index(request):
                 overall_predicted = template_context.get('overall_predicted', [])
                 ingredient_chart_data = template_context.get('ingredient_chart_data', {})
                 all_products_list = template_context.get('ingredients_list', [])
-                ingredients_json = json.dumps(all_products_list)
-                chart_data_json = template_context.get('chart_data_json', chart_data_json)
+                chart_data_for_js = template_context.get('chart_data', chart_data_for_js)
                 
                 logger.info(f"Extracted {len(all_products_list)} products: {all_products_list}")
                 logger.info(f"Overall data: {len(overall_months)} months, {len(overall_historical)} historical, {len(overall_predicted)} predicted")
@@ -242,9 +270,8 @@ def index(request):
                                     'predicted': ing_data.get('predicted', [])
                                 }
                         all_products_list = list(ingredients_data.keys())
-                        ingredients_json = json.dumps(all_products_list)
                     
-                    chart_data_for_template = {
+                    chart_data_for_js = {
                         'overall': {
                             'months': overall_months,
                             'historical': overall_historical,
@@ -253,17 +280,16 @@ def index(request):
                         'ingredients': ingredient_chart_data,
                         'ingredients_list': all_products_list
                     }
-                    chart_data_json = json.dumps(chart_data_for_template)
             except Exception as e2:
                 logger.error("Fallback extraction failed: %s", str(e2))
         except Exception as e:
             logger.error("Error extracting data with Universal Extractor: %s", str(e), exc_info=True)
             # Fallback to empty data - don't crash
-            chart_data_json = json.dumps({
+            chart_data_for_js = {
                 'overall': {'months': [], 'historical': [], 'predicted': []},
                 'ingredients': {},
                 'ingredients_list': []
-            })
+            }
     
     return render(request, 'excel_handler/index.html', {
         'data': data, 
@@ -272,9 +298,32 @@ def index(request):
         'uploaded_file': uploaded_file,
         'error_message': error_message,
         'warning_message': warning_message,
-        'chart_data_json': chart_data_json,
+        'chart_data': chart_data_for_js,
     })
 
+# Ingredient section codes, in the order they appear in the sheet
+INGREDIENT_CODES = ['MCT360', 'MCT165', 'MCTSTICK10', 'MCTSTICK30', 'MCTSTICK16', 'MCTITTO_C']
+# Captures the lower-cased ingredient code contained in a column A cell
+INGREDIENT_CODE_PATTERN = re.compile('(' + '|'.join(re.escape(code.lower()) for code in INGREDIENT_CODES) + ')')
+
+
+def _ingredient_code_hits(col_a_lower):
+    """Lower-cased ingredient code found in each cell (NaN where none), in one regex pass."""
+    return col_a_lower.str.extract(INGREDIENT_CODE_PATTERN, expand=False).to_numpy()
+
+
+def _mark_ingredient_regions(regions, starts, total_rows):
+    """
+    Label every row from each ingredient's start row up to the next ingredient's start
+    (the last one runs to the end of the sheet). Returns the first start row.
+    """
+    sorted_starts = sorted(starts.items(), key=lambda x: x[1])
+    for idx, (ing, start) in enumerate(sorted_starts):
+        end = sorted_starts[idx + 1][1] if idx + 1 < len(sorted_starts) else total_rows
+        regions.update(dict.fromkeys(range(start, end), 'ingredient_' + ing.lower()))
+    return sorted_starts[0][1]
+
+
 def parse_excel_regions(df):
     """
     Parse Excel file structure to identify regions.
@@ -287,6 +336,12 @@ def parse_excel_regions(df):
     if total_rows == 0:
         return regions
     
+    # Row-wise emptiness and lower-cased column A, computed once for the whole frame
+    all_nan = df.isna().all(axis=1).to_numpy()
+    max_col_idx = min(16, len(df.columns))
+    cp_nan = df.iloc[:, 2:max_col_idx].isna().all(axis=1).to_numpy()
+    col_a_lower = df['A'].astype(str).str.lower() if 'A' in df.columns else None
+    
     # Row 0: title
     regions[0] = 'title'
     
@@ -297,42 +352,30 @@ def parse_excel_regions(df):
     # Find the next completely empty row (separator)
     separator_row = -1
     for i in range(2, min(total_rows, 100)):  # Limit search to first 100 rows
-        if df.iloc[i].isna().all():
+        if all_nan[i]:
             separator_row = i
             break
     
     # If no separator found, try to detect structure by looking for ingredient codes
     if separator_row == -1:
-        # Check if we can find ingredient codes anywhere in column A
-        ingredients = ['MCT360', 'MCT165', 'MCTSTICK10', 'MCTSTICK30', 'MCTSTICK16', 'MCTITTO_C']
+        # Search the first 200 rows of column A for each ingredient code independently
         found_ingredients = {}
-        
-        # Search column A for ingredient codes
-        if 'A' in df.columns:
-            for i in range(2, min(total_rows, 200)):  # Search first 200 rows
-                try:
-                    cell_value = str(df.iloc[i]['A']).lower()
-                    for ing in ingredients:
-                        if ing.lower() in cell_value and ing not in found_ingredients:
-                            found_ingredients[ing] = i
-                except (KeyError, IndexError):
-                    continue
+        if col_a_lower is not None:
+            head_codes = _ingredient_code_hits(col_a_lower.iloc[2:min(total_rows, 200)])
+            for ing in INGREDIENT_CODES:
+                hits = head_codes == ing.lower()
+                if hits.any():
+                    found_ingredients[ing] = 2 + int(np.argmax(hits))
         
         # If we found ingredients, mark them
         if found_ingredients:
-            sorted_ingredients = sorted(found_ingredients.items(), key=lambda x: x[1])
-            for idx, (ing, start) in enumerate(sorted_ingredients):
-                end = sorted_ingredients[idx + 1][1] if idx + 1 < len(sorted_ingredients) else total_rows
-                for j in range(start, end):
-                    regions[j] = 'ingredient_' + ing.lower()
+            first_ingredient_row = _mark_ingredient_regions(regions, found_ingredients, total_rows)
             # Mark rows before first ingredient as annual_data or unknown
-            first_ingredient_row = sorted_ingredients[0][1]
             for i in range(2, first_ingredient_row):
                 regions[i] = 'annual_data' if i > 2 else 'annual_header'
         else:
             # No structure detected, mark all as unknown
-            for i in range(2, total_rows):
-                regions[i] = 'unknown'
+            regions.update(dict.fromkeys(range(2, total_rows), 'unknown'))
         return regions
     
     # Annual data set: rows 2 to separator_row - 1
@@ -344,9 +387,8 @@ def parse_excel_regions(df):
     row_idx = 3
     while row_idx < separator_row:
         # Check if columns C-P exist before checking
-        max_col_idx = min(16, len(df.columns))
         if max_col_idx > 2:
-            if df.iloc[row_idx].iloc[2:max_col_idx].isna().all():  # empty in C to P
+            if cp_nan[row_idx]:  # empty in C to P
                 regions[row_idx] = 'annual_separator'
                 row_idx += 1
             else:
@@ -362,7 +404,7 @@ def parse_excel_regions(df):
     
     # Ingredient data set: from separator_row to end
     start_ingredient = separator_row
-    if start_ingredient < total_rows and df.iloc[start_ingredient].isna().all():
+    if start_ingredient < total_rows and all_nan[start_ingredient]:
         regions[start_ingredient] = 'empty'
         start_ingredient += 1
     
@@ -371,32 +413,25 @@ def parse_excel_regions(df):
         if start_ingredient + i < total_rows:
             regions[start_ingredient + i] = 'ingredient_header'
     
-    # Detect ingredient regions starting from after headers
-    ingredients = ['MCT360', 'MCT165', 'MCTSTICK10', 'MCTSTICK30', 'MCTSTICK16', 'MCTITTO_C']
+    # Detect ingredient regions starting from after headers; each code is
+    # searched within 500 rows after the previous match
     current_start = start_ingredient + 3
     starts = {}
     temp_start = current_start
     
     # Check if column A exists
-    if 'A' in df.columns:
-        for ing in ingredients:
-            for i in range(temp_start, min(total_rows, temp_start + 500)):  # Limit search
-                try:
-                    cell_value = str(df.iloc[i]['A']).lower()
-                    if ing.lower() in cell_value:
-                        starts[ing] = i
-                        temp_start = i + 1
-                        break
-                except (KeyError, IndexError):
-                    continue
+    if col_a_lower is not None and current_start < total_rows:
+        tail_codes = _ingredient_code_hits(col_a_lower.iloc[current_start:])
+        for ing in INGREDIENT_CODES:
+            hits = tail_codes == ing.lower()
+            offset = temp_start - current_start
+            window = hits[offset:offset + 500]
+            if window.any():
+                starts[ing] = temp_start + int(np.argmax(window))
+                temp_start = starts[ing] + 1
     
-    # Sort by start index
     if starts:
-        sorted_starts = sorted(starts.items(), key=lambda x: x[1])
-        for idx, (ing, start) in enumerate(sorted_starts):
-            end = sorted_starts[idx + 1][1] if idx + 1 < len(sorted_starts) else total_rows
-            for j in range(start, end):
-                regions[j] = 'ingredient_' + ing.lower()
+        _mark_ingredient_regions(regions, starts, total_rows)
     
     return regions
 
@@ -428,30 +463,41 @@ def workflow4_view(request):
     return render(request, 'excel_handler/workflow4.html', context)
 
 
+def _static_chart_url(chart_name: str) -> str:
+    """Static URL for a generated chart, versioned by the file's mtime so browsers can cache it."""
+    try:
+        chart_version = int(os.path.getmtime(Path(settings.BASE_DIR) / 'static' / chart_name))
+    except OSError:
+        chart_version = 0
+    return f"{settings.STATIC_URL}{chart_name}?v={chart_version}"
+
+
+def _media_url(path: Path, fallback_dir: str = '') -> str:
+    """Media URL for a file; paths outside MEDIA_ROOT fall back to fallback_dir + file name."""
+    try:
+        relative_str = str(path.relative_to(settings.MEDIA_ROOT))
+    except ValueError:
+        relative_str = f"{fallback_dir}{path.name}"
+    return f"{settings.MEDIA_URL}{relative_str.replace(os.sep, '/')}"
+
+
+# Workflow-4 forecast table headers -> template keys
+FORECAST_COLUMN_KEYS = {
+    'Product': 'product',
+    'Forecast Demand': 'forecast_demand',
+    'Per Unit Consumption': 'per_unit_consumption',
+    'Raw Material Needed': 'raw_material_needed',
+}
+
+
 def _build_workflow4_context(result: Workflow4Result) -> dict:
-    forecast_rows = [
-        {
-            'product': row['Product'],
-            'forecast_demand': row['Forecast Demand'],
-            'per_unit_consumption': row['Per Unit Consumption'],
-            'raw_material_needed': row['Raw Material Needed'],
-        }
-        for row in result.forecast_table.to_dict('records')
-    ]
-    raw_material_rows = [
-        {
-            'product': row['product'],
-            'forecast_demand': row['forecast_demand'],
-            'raw_material_needed': row['raw_material_needed'],
-        }
-        for row in forecast_rows
-    ]
+    forecast_table = result.forecast_table[list(FORECAST_COLUMN_KEYS)].rename(columns=FORECAST_COLUMN_KEYS)
+    forecast_rows = forecast_table.to_dict('records')
+    raw_material_rows = forecast_table[['product', 'forecast_demand', 'raw_material_needed']].to_dict('records')
     trend_rows = []
     if not result.monthly_trend.empty:
         demand_copy = result.monthly_trend.copy()
-        demand_copy['month_index'] = demand_copy['month'].apply(
-            lambda label: MONTH_NAMES.index(label) + 1 if label in MONTH_NAMES else None
-        )
+        demand_copy['month_index'] = demand_copy['month'].map(MONTH_INDEX)
         aggregated = (
             demand_copy.dropna(subset=['month_index'])
             .groupby(['month', 'month_index'], as_index=False)['demand']
@@ -460,15 +506,9 @@ def _build_workflow4_context(result: Workflow4Result) -> dict:
             .drop(columns=['month_index'])
         )
         trend_rows = aggregated.to_dict('records')
-    chart_version = int(datetime.utcnow().timestamp())
-    demand_chart_url = f"{settings.STATIC_URL}{result.charts['demand']}?v={chart_version}"
-    raw_chart_url = f"{settings.STATIC_URL}{result.charts['raw_material']}?v={chart_version}"
-    try:
-        relative_excel = result.final_excel_path.relative_to(settings.MEDIA_ROOT)
-        relative_str = str(relative_excel)
-    except ValueError:
-        relative_str = result.final_excel_path.name
-    download_url = f"{settings.MEDIA_URL}{relative_str.replace(os.sep, '/')}"
+    demand_chart_url = _static_chart_url(result.charts['demand'])
+    raw_chart_url = _static_chart_url(result.charts['raw_material'])
+    download_url = _media_url(result.final_excel_path)
     return {
         'forecast_rows': forecast_rows,
         'raw_material_rows': raw_material_rows,
@@ -483,37 +523,138 @@ def _build_workflow4_context(result: Workflow4Result) -> dict:
 def upload_excel(request):
     if request.method == 'POST' and request.FILES.get('excel_file'):
         excel_file = request.FILES['excel_file']
-        uploaded_file = UploadedExcelFile.objects.create(file=excel_file)
-        # Process the file
-        df = pd.read_excel(uploaded_file.file.path, header=None)
-        df.columns = [chr(65 + i) for i in range(len(df.columns))]
-        # Example manipulation: filter rows where first column > 10 (assuming numeric)
-        if not df.empty and len(df.columns) > 0:
-            col = df.columns[0]
-            df_filtered = df[df[col] > 10] if pd.api.types.is_numeric_dtype(df[col]) else df
-        else:
-            df_filtered = df
-        df_filtered = df_filtered.replace({np.nan: None})
-        # Save processed data
-        data_json = df_filtered.to_dict(orient='records')
-        ProcessedData.objects.create(original_file=uploaded_file, data=data_json)
+        uploaded_file = None
+        # Upload and processed rows are committed together
+        try:
+            with transaction.atomic():
+                uploaded_file = UploadedExcelFile.objects.create(file=excel_file)
+                # Process the file
+                df = read_upload_frame(uploaded_file.file.path)
+                df.columns = column_letters(len(df.columns))
+                # Example manipulation: filter rows where first column > 10 (assuming numeric)
+                if not df.empty and len(df.columns) > 0:
+                    col = df.columns[0]
+                    if pd.api.types.is_numeric_dtype(df[col]):
+                        # NaN > 10 is False, so missing values drop out of the mask too
+                        df_filtered = df.iloc[df[col].to_numpy() > 10]
+                    else:
+                        df_filtered = df
+                else:
+                    df_filtered = df
+                # Save processed data (missing cells become None in the same pass)
+                data_json = (
+                    df_filtered.astype(object)
+                    .where(df_filtered.notna(), None)
+                    .to_dict(orient='records')
+                )
+                ProcessedData.objects.create(original_file=uploaded_file, data=data_json)
+        except Exception:
+            # The rolled-back row no longer points at the saved file, so remove it as well
+            if uploaded_file is not None:
+                uploaded_file.file.delete(save=False)
+            raise
         return JsonResponse({'message': 'File uploaded and processed', 'id': uploaded_file.id})
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
+def _json_default(obj):
+    """Fallback encoder for the stdlib json module: dataclasses become dicts."""
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj):
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, default=_json_default).encode()
+
+JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _json_scalar(value):
+    """NumPy scalars become their Python value; anything else JSON cannot hold goes through str()."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    return value if isinstance(value, JSON_SCALAR_TYPES) else str(value)
+
+
+def to_json_compatible(rows):
+    """
+    Return the row dicts with values JSON cannot represent (timestamps, etc.) converted.
+    Rows that already hold only JSON scalars are reused as-is; the JSONField encodes
+    the result once when it is saved.
+    """
+    return [
+        row if all(isinstance(v, JSON_SCALAR_TYPES) for v in row.values())
+        else {k: v if isinstance(v, JSON_SCALAR_TYPES) else _json_scalar(v) for k, v in row.items()}
+        for row in rows
+    ]
+
+def write_records_to_xlsx(buffer, records):
+    """
+    Write a list of row dicts to a single-sheet workbook in buffer.
+    Columns follow first-seen key order, as pd.DataFrame(records) would.
+    """
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    if xlsxwriter is None:
+        # write_only streams rows instead of keeping a Cell object per value
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet()
+        worksheet.append([str(column) for column in columns])
+        for record in records:
+            worksheet.append([record.get(column) for column in columns])
+        workbook.save(buffer)
+        return
+    # constant_memory flushes each row as soon as the next one starts
+    workbook = xlsxwriter.Workbook(buffer, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+    })
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, [str(column) for column in columns])
+    for row_idx, record in enumerate(records, start=1):
+        worksheet.write_row(row_idx, 0, [record.get(column) for column in columns])
+    workbook.close()
+
 def download_processed(request, file_id):
     try:
         processed = ProcessedData.objects.get(original_file_id=file_id)
-        df = pd.DataFrame(processed.data)
         buffer = io.BytesIO()
-        df.to_excel(buffer, index=False, engine='openpyxl')
+        write_records_to_xlsx(buffer, processed.data)
         buffer.seek(0)
-        response = HttpResponse(buffer.getvalue(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="processed_{file_id}.xlsx"'
-        return response
+        # FileResponse streams the buffer in chunks and sets Content-Length itself
+        return FileResponse(
+            buffer,
+            as_attachment=True,
+            filename=f'processed_{file_id}.xlsx',
+            content_type=XLSX_CONTENT_TYPE,
+        )
     except ProcessedData.DoesNotExist:
         return JsonResponse({'error': 'Processed data not found'}, status=404)
 
 
+# Month name -> position in the fiscal year (April = 0)
+FISCAL_MONTH_INDEX = {month: idx for idx, month in enumerate(FISCAL_MONTHS)}
+# Month name -> calendar month number (April = 4), and the year offset of
+# January-March, which fall in the second calendar year of the fiscal year
+FISCAL_MONTH_NUMBER = {month: (idx + 3) % 12 + 1 for idx, month in enumerate(FISCAL_MONTHS)}
+FISCAL_MONTH_YEAR_OFFSET = {month: int(idx + 4 > 12) for idx, month in enumerate(FISCAL_MONTHS)}
+
+
+def generate_predicted_months(last_month_name, num_months=6):
+    """
+    Next num_months month names after last_month_name, following fiscal month order.
+    Unrecognised names continue from the current calendar month.
+    """
+    last_idx = FISCAL_MONTH_INDEX.get(last_month_name)
+    if last_idx is not None:
+        return [FISCAL_MONTHS[(last_idx + i) % 12] for i in range(1, num_months + 1)]
+    current_month = datetime.now().month - 1  # 0-indexed
+    return [MONTH_NAMES[(current_month + i) % 12] for i in range(1, num_months + 1)]
+
+
 def process_all_workflows(request):
     """
     Main processing endpoint that runs all workflows including Workflow-4,
@@ -527,15 +668,15 @@ def process_all_workflows(request):
         return JsonResponse({'error': 'File ID is required'}, status=400)
     
     try:
-        uploaded_file_obj = UploadedExcelFile.objects.get(id=file_id)
+        uploaded_file_obj = UploadedExcelFile.objects.only('file').get(id=file_id)
         original_path = Path(uploaded_file_obj.file.path)
         
-        # Run Workflow-4 pipeline
+        # Run Workflow-4 pipeline. No original_file_path: the copy of the original workbook
+        # is written once below, so the pipeline only streams its consolidated outputs
         result = run_workflow4_pipeline(
             str(original_path),
             processed_dir=Path(settings.MEDIA_ROOT) / 'uploads' / 'processed',
             charts_dir=Path(settings.BASE_DIR) / 'static' / 'charts',
-            original_file_path=original_path,
         )
         
         # Write results back to original Excel file structure
@@ -544,23 +685,16 @@ def process_all_workflows(request):
         timestamp = datetime.now().strftime("%Y_%m_%d_%H%M%S")
         final_output_path = processed_dir / f"processed_{file_id}_{timestamp}.xlsx"
         
-        # Copy original file first
-        import shutil
-        shutil.copy2(original_path, final_output_path)
-        
-        # Write Workflow-4 results to the copied file
+        # Write Workflow-4 results into a copy of the original workbook
+        # (openpyxl loads the original and saves straight to the output path)
         write_results_to_original_excel(
-            final_output_path,
+            original_path,
             result.forecast_table,
             final_output_path,
         )
         
         # Store the final file path in session or return it
-        try:
-            relative_path = final_output_path.relative_to(settings.MEDIA_ROOT)
-            download_url = f"{settings.MEDIA_URL}{str(relative_path).replace(os.sep, '/')}"
-        except ValueError:
-            download_url = f"{settings.MEDIA_URL}uploads/processed/{final_output_path.name}"
+        download_url = _media_url(final_output_path, 'uploads/processed/')
         
         # Get ingredient_list and annual_data from processed data
         processed_data = ProcessedData.objects.filter(original_file=uploaded_file_obj).first()
@@ -569,21 +703,19 @@ def process_all_workflows(request):
         
         if processed_data:
             data = processed_data.data
-            annual_data = [{k: v for k, v in row.items() if k != 'region' and k <= 'P'} 
+            annual_data = [{k: v for k, v in row.items() if k in ANNUAL_COLS} 
                           for row in data if row.get('region') in ['annual_data', 'annual_separator']][1:]
             
             # Extract ingredient data
             ingredients = ['mct360', 'mct165', 'mctstick10', 'mctstick30', 'mctstick16', 'mctitto_c']
-            ingredient_list = [(ing, []) for ing in ingredients]
+            ingredient_rows = {ing: [] for ing in ingredients}
             for row in data:
                 region = row.get('region', 'unknown')
                 if region.startswith('ingredient_'):
-                    ing = region.split('_', 1)[1]
-                    for item in ingredient_list:
-                        if item[0] == ing:
-                            filtered_row = {k: v for k, v in row.items() if k != 'region' and k <= 'Q'}
-                            item[1].append(filtered_row)
-                            break
+                    rows = ingredient_rows.get(region[len('ingredient_'):])
+                    if rows is not None:
+                        rows.append({k: v for k, v in row.items() if k in INGREDIENT_COLS})
+            ingredient_list = list(ingredient_rows.items())
         
         # Build chart data from workflow4 results
         try:
@@ -599,34 +731,6 @@ def process_all_workflows(request):
         # Convert to JSON format for frontend
         products_chart_data = []
         
-        # Helper function to generate predicted months from last historical month
-        def generate_predicted_months(last_month_name, num_months=6):
-            """Generate next N months following fiscal month order"""
-            predicted_months = []
-            if last_month_name in FISCAL_MONTHS:
-                last_month_idx = FISCAL_MONTHS.index(last_month_name)
-                for i in range(1, num_months + 1):
-                    next_idx = (last_month_idx + i) % 12
-                    predicted_months.append(FISCAL_MONTHS[next_idx])
-            elif last_month_name in MONTH_NAMES:
-                # Convert calendar month to fiscal month order
-                # Find the fiscal month index
-                last_month_idx = MONTH_NAMES.index(last_month_name)
-                # Map to fiscal order: April=0, May=1, ..., March=11
-                fiscal_idx = (last_month_idx - 3) % 12  # April (index 3) -> 0
-                for i in range(1, num_months + 1):
-                    next_fiscal_idx = (fiscal_idx + i) % 12
-                    # Map back to calendar month
-                    calendar_idx = (next_fiscal_idx + 3) % 12
-                    predicted_months.append(MONTH_NAMES[calendar_idx])
-            else:
-                # Default: start from current month
-                current_month = datetime.now().month - 1  # 0-indexed
-                for i in range(1, num_months + 1):
-                    next_idx = (current_month + i) % 12
-                    predicted_months.append(MONTH_NAMES[next_idx])
-            return predicted_months
-        
         # Add overall data as first product
         overall_data = chart_data_dict.get('overall', {})
         if overall_data and overall_data.get('months') and overall_data.get('historical'):
@@ -638,7 +742,8 @@ def process_all_workflows(request):
             if overall_months:
                 predicted_month_names = generate_predicted_months(overall_months[-1], len(overall_predicted))
             else:
-                predicted_month_names = [MONTH_NAMES[(datetime.now().month - 1 + i) % 12] for i in range(1, len(overall_predicted) + 1)]
+                current_month = datetime.now().month - 1
+                predicted_month_names = [MONTH_NAMES[(current_month + i) % 12] for i in range(1, len(overall_predicted) + 1)]
             
             products_chart_data.append({
                 'product_code': 'OVERALL',
@@ -701,6 +806,25 @@ def process_all_workflows(request):
         return JsonResponse({'error': f'An error occurred: {str(exc)}'}, status=500)
 
 
+def latest_processed_file(file_id):
+    """
+    Most recent processed_<file_id>_<timestamp>.xlsx in the processed uploads folder, or None.
+    The timestamp is zero-padded (%Y_%m_%d_%H%M%S), so the largest name is the newest
+    file and no stat() call is needed per candidate.
+    """
+    processed_dir = Path(settings.MEDIA_ROOT) / 'uploads' / 'processed'
+    prefix = f"processed_{file_id}_"
+    try:
+        with os.scandir(processed_dir) as entries:
+            names = [
+                entry.name for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith('.xlsx')
+            ]
+    except FileNotFoundError:
+        return None
+    return processed_dir / max(names) if names else None
+
+
 def download_final_file(request, file_id):
     """
     Download the final processed Excel file with all workflow results.
@@ -709,201 +833,249 @@ def download_final_file(request, file_id):
         uploaded_file_obj = UploadedExcelFile.objects.get(id=file_id)
         
         # Find the most recent processed file for this upload
-        processed_dir = Path(settings.MEDIA_ROOT) / 'uploads' / 'processed'
-        pattern = f"processed_{file_id}_*.xlsx"
-        matching_files = list(processed_dir.glob(pattern))
+        latest_file = latest_processed_file(file_id)
         
-        if not matching_files:
-            # Fallback: try to find any processed file
+        if latest_file is None:
             return JsonResponse({'error': 'Processed file not found'}, status=404)
         
-        # Get the most recent file
-        latest_file = max(matching_files, key=lambda p: p.stat().st_mtime)
-        
-        with open(latest_file, 'rb') as f:
-            response = HttpResponse(
-                f.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
-            response['Content-Disposition'] = f'attachment; filename="processed_{file_id}.xlsx"'
-            return response
+        # FileResponse streams the file (sendfile via wsgi.file_wrapper where available)
+        return FileResponse(
+            open(latest_file, 'rb'),
+            as_attachment=True,
+            filename=f'processed_{file_id}.xlsx',
+            content_type=XLSX_CONTENT_TYPE,
+        )
     except UploadedExcelFile.DoesNotExist:
         return JsonResponse({'error': 'File not found'}, status=404)
     except Exception as exc:
         return JsonResponse({'error': f'An error occurred: {str(exc)}'}, status=500)
 
 
-def get_chart_data(request, file_id):
+# Serialized chart-data responses are reused until their source files change
+CHART_RESPONSE_CACHE_TIMEOUT = 3600
+
+
+@dataclass(slots=True)
+class ChartProduct:
+    """One product series in a chart-data response; dumps_json serializes it as an object."""
+    product_code: str
+    sheet_name: str
+    historical: list
+    predicted: list
+
+
+def _file_version(path):
+    """'<mtime_ns>:<size>' of path, or '-' when there is no such file."""
+    if path is None:
+        return '-'
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return '-'
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+async def _json_response(request, cache_key, build_body):
     """
-    Standardized API endpoint to get chart data for a specific file.
-    Returns data in the format expected by frontend charts.
+    JSON response for a payload identified by cache_key, built by build_body() (async) on a miss.
+    The key doubles as a weak ETag, so a client polling an unchanged file gets a 304 and
+    skips the body; Cache-Control asks it to revalidate on every poll.
     """
+    etag = 'W/"%s"' % hashlib.blake2b(cache_key.encode(), digest_size=16).hexdigest()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        body = await cache.aget(cache_key)
+        if body is None:
+            body = await build_body()
+            await cache.aset(cache_key, body, CHART_RESPONSE_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _prefetch_file(path):
+    """
+    Ask the kernel to start reading path into the page cache ahead of a full sequential read.
+    Only a hint: a no-op where posix_fadvise is unavailable (e.g. Windows) or the call fails.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
     try:
-        uploaded_file_obj = UploadedExcelFile.objects.get(id=file_id)
-        
-        # Try to get processed Excel file from workflow4
-        processed_dir = Path(settings.MEDIA_ROOT) / 'uploads' / 'processed'
-        pattern = f"processed_{file_id}_*.xlsx"
-        matching_files = list(processed_dir.glob(pattern))
-        
-        products_data = []
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def following_months(last_month, count):
+    """'YYYY-MM' labels of the count months after last_month ('YYYY-MM')."""
+    year, month = map(int, last_month.split('-'))
+    base = year * 12 + month - 1  # months since year 0, January = 0
+    return [f"{(base + i) // 12}-{(base + i) % 12 + 1:02d}" for i in range(1, count + 1)]
+
+
+def _chart_products(uploaded_file_obj, latest_file):
+    """
+    Product series for get_chart_data: from the Workflow 4 sheet of the newest
+    processed file when there is one, otherwise from the stored ingredient rows.
+    """
+    products_data = []
+    # Base year of the YYYY-MM labels, looked up once per response
+    current_year = datetime.now().year
+    
+    if latest_file is not None:
+        logger.info("Extracting chart data from processed file: %s", latest_file)
         
-        if matching_files:
-            # Use the most recent processed file
-            latest_file = max(matching_files, key=lambda p: p.stat().st_mtime)
-            logger.info("Extracting chart data from processed file: %s", latest_file)
-            
-            # Read the Excel file
-            excel_file = pd.ExcelFile(latest_file)
-            
-            # Try to get data from Workflow 4 sheet
-            workflow4_sheet = None
-            for sheet_name in excel_file.sheet_names:
-                if 'workflow' in sheet_name.lower() and '4' in sheet_name:
-                    workflow4_sheet = pd.read_excel(latest_file, sheet_name=sheet_name)
-                    break
-            
-            if workflow4_sheet is not None and not workflow4_sheet.empty:
-                # Extract product codes from Workflow 4 sheet
-                if 'Product' in workflow4_sheet.columns:
-                    product_codes = workflow4_sheet['Product'].dropna().unique()
-                    
-                    for product_code in product_codes:
-                        product_str = str(product_code).strip()
-                        if not product_str:
-                            continue
-                        
-                        # Get historical data from monthly_trend if available
-                        # Otherwise extract from original Excel
-                        historical = []
-                        predicted = []
-                        
-                        # Try to get from workflow4 monthly_trend
-                        # For now, extract from the original file structure
-                        try:
-                            # Read original file to get historical data
-                            original_df = pd.read_excel(uploaded_file_obj.file.path, header=None)
-                            original_df.columns = [chr(65 + i) for i in range(len(original_df.columns))]
-                            
-                            # Extract monthly series
-                            monthly_series = extract_from_workflow4_sheet(
-                                str(latest_file), product_str
-                            )
-                            
-                            # Convert to historical format
-                            for month_name, value in monthly_series.items():
-                                # Create YYYY-MM format (using current year as base)
-                                current_year = datetime.now().year
-                                month_num = FISCAL_MONTHS.index(month_name) + 4  # April = 4
-                                if month_num > 12:
-                                    month_num -= 12
-                                    year = current_year + 1
-                                else:
-                                    year = current_year
-                                
-                                historical.append({
-                                    'month': f"{year}-{month_num:02d}",
-                                    'value': float(value)
-                                })
-                            
-                            # Get predicted values from Workflow 4 forecast table
-                            product_row = workflow4_sheet[workflow4_sheet['Product'] == product_code]
-                            if not product_row.empty:
-                                forecast_demand = float(product_row.iloc[0]['Forecast Demand'])
-                                
-                                # Generate predicted months (next 6 months)
-                                if historical:
-                                    last_month = historical[-1]['month']
-                                    year, month = map(int, last_month.split('-'))
-                                    
-                                    for i in range(1, 7):
-                                        month += 1
-                                        if month > 12:
-                                            month = 1
-                                            year += 1
-                                        
-                                        predicted.append({
-                                            'month': f"{year}-{month:02d}",
-                                            'value': forecast_demand  # Use forecast demand for all predicted months
-                                        })
-                            
-                        except Exception as e:
-                            logger.error("Error extracting data for product %s: %s", product_str, str(e))
-                            continue
-                        
-                        products_data.append({
-                            'product_code': product_str,
-                            'sheet_name': 'Workflow 4',
-                            'historical': historical,
-                            'predicted': predicted
-                        })
+        # Read the Excel file
+        _prefetch_file(latest_file)
+        # Try to get data from Workflow 4 sheet, parsed from the already-open workbook
+        workflow4_sheet = None
+        with pd.ExcelFile(latest_file, engine=EXCEL_READ_ENGINE) as excel_file:
+            sheet_name = find_workflow4_sheet_name(excel_file.sheet_names)
+            if sheet_name is not None:
+                workflow4_sheet = excel_file.parse(sheet_name)
         
-        # If no workflow4 data, try to extract from ingredient sections
-        if not products_data:
-            processed_data = ProcessedData.objects.filter(original_file=uploaded_file_obj).first()
-            if processed_data:
-                data = processed_data.data
-                ingredient_list = []
-                ingredients = ['mct360', 'mct165', 'mctstick10', 'mctstick30', 'mctstick16', 'mctitto_c']
-                
-                for ing_name in ingredients:
-                    ing_rows = [row for row in data 
-                               if row.get('region', '').startswith(f'ingredient_{ing_name}')]
-                    if ing_rows:
-                        ingredient_list.append((ing_name, ing_rows))
+        if workflow4_sheet is not None and not workflow4_sheet.empty:
+            # Extract product codes from Workflow 4 sheet
+            if 'Product' in workflow4_sheet.columns:
+                product_codes = workflow4_sheet['Product'].dropna().unique()
+                # Forecast demand of each product's first row, looked up per product below.
+                # Cells that are not numbers are dropped here, once, so the loop cannot fail on them.
+                first_rows = workflow4_sheet.drop_duplicates('Product')
+                if 'Forecast Demand' in first_rows.columns:
+                    forecast_demand = pd.to_numeric(first_rows['Forecast Demand'], errors='coerce')
+                    valid = forecast_demand.notna().to_numpy()
+                    forecast_by_product = dict(zip(
+                        first_rows['Product'].to_numpy()[valid],
+                        forecast_demand.to_numpy(dtype=np.float64)[valid].tolist(),
+                    ))
+                else:
+                    forecast_by_product = {}
                 
-                for ing_name, rows in ingredient_list:
-                    monthly_series = extract_from_ingredient_section(rows, ing_name.upper())
+                for product_code in product_codes:
+                    product_str = str(product_code).strip()
+                    if not product_str:
+                        continue
                     
-                    historical = []
-                    predicted = []
+                    # Extract monthly series from the sheet loaded above
+                    # (extract_from_workflow4_frame logs and returns an empty series on error)
+                    monthly_series = extract_from_workflow4_frame(workflow4_sheet, product_str)
                     
-                    current_year = datetime.now().year
-                    for month_name, value in monthly_series.items():
-                        month_num = FISCAL_MONTHS.index(month_name) + 4
-                        if month_num > 12:
-                            month_num -= 12
-                            year = current_year + 1
-                        else:
-                            year = current_year
-                        
-                        historical.append({
-                            'month': f"{year}-{month_num:02d}",
-                            'value': float(value)
-                        })
+                    # Convert to historical format, YYYY-MM using the current year as base
+                    historical = [
+                        {
+                            'month': f"{current_year + FISCAL_MONTH_YEAR_OFFSET[month_name]}-"
+                                     f"{FISCAL_MONTH_NUMBER[month_name]:02d}",
+                            'value': value,
+                        }
+                        for month_name, value in monthly_series.items()
+                    ]
                     
-                    # Generate predictions
-                    if historical:
-                        historical_values = [h['value'] for h in historical]
-                        from .prediction_utils import predict_next_months
-                        predictions = predict_next_months(historical_values, 6, 'moving_average')
-                        
-                        last_month = historical[-1]['month']
-                        year, month = map(int, last_month.split('-'))
-                        
-                        for pred_value in predictions:
-                            month += 1
-                            if month > 12:
-                                month = 1
-                                year += 1
-                            
-                            predicted.append({
-                                'month': f"{year}-{month:02d}",
-                                'value': float(pred_value)
-                            })
+                    # Predicted values from the Workflow 4 forecast table (next 6 months)
+                    predicted = []
+                    forecast = forecast_by_product.get(product_code)
+                    if forecast is not None and historical:
+                        predicted = [
+                            # Use forecast demand for all predicted months
+                            {'month': month, 'value': forecast}
+                            for month in following_months(historical[-1]['month'], 6)
+                        ]
                     
-                    products_data.append({
-                        'product_code': ing_name.upper(),
-                        'sheet_name': 'Ingredient Section',
-                        'historical': historical,
-                        'predicted': predicted
+                    products_data.append(ChartProduct(product_str, 'Workflow 4', historical, predicted))
+    
+    # If no workflow4 data, try to extract from ingredient sections
+    if not products_data:
+        processed_data = ProcessedData.objects.filter(original_file=uploaded_file_obj).first()
+        if processed_data:
+            data = processed_data.data
+            ingredients = ['mct360', 'mct165', 'mctstick10', 'mctstick30', 'mctstick16', 'mctitto_c']
+            
+            # Bucket the rows by ingredient region in a single pass over the data
+            ingredient_rows = {ing: [] for ing in ingredients}
+            for row in data:
+                region = row.get('region', '')
+                if region.startswith('ingredient_'):
+                    rows = ingredient_rows.get(region[len('ingredient_'):])
+                    if rows is not None:
+                        rows.append(row)
+            ingredient_list = [(ing_name, rows) for ing_name, rows in ingredient_rows.items() if rows]
+            
+            series_by_name = {
+                ing_name: extract_from_ingredient_section(rows, ing_name.upper())
+                for ing_name, rows in ingredient_list
+            }
+            # Moving-average predictions for every ingredient in one NumPy pass
+            predictions_by_name = predict_next_months_batch(series_by_name, 6)
+            
+            for ing_name, monthly_series in series_by_name.items():
+                historical = []
+                predicted = []
+                
+                for month_name, value in monthly_series.items():
+                    month_num = FISCAL_MONTH_NUMBER[month_name]
+                    year = current_year + FISCAL_MONTH_YEAR_OFFSET[month_name]
+                    
+                    historical.append({
+                        'month': f"{year}-{month_num:02d}",
+                        'value': float(value)
                     })
+                
+                # Generate predictions
+                if historical:
+                    predictions = predictions_by_name[ing_name]
+                    
+                    predicted = [
+                        {'month': month, 'value': float(pred_value)}
+                        for month, pred_value in zip(
+                            following_months(historical[-1]['month'], len(predictions)), predictions
+                        )
+                    ]
+                
+                products_data.append(
+                    ChartProduct(ing_name.upper(), 'Ingredient Section', historical, predicted)
+                )
+    
+    return products_data
+
+
+def _chart_body(file_id, uploaded_file_obj, latest_file):
+    """JSON body of get_chart_data for the upload and its latest processed file."""
+    return dumps_json({
+        'file_id': str(file_id),
+        'products': _chart_products(uploaded_file_obj, latest_file),
+        'processed_at': datetime.utcnow().isoformat() + 'Z'
+    })
+
+
+async def get_chart_data(request, file_id):
+    """
+    Standardized API endpoint to get chart data for a specific file.
+    Returns data in the format expected by frontend charts.
+    Excel parsing and JSON encoding run through sync_to_async. Under the gunicorn WSGI
+    deployment Django wraps this view in async_to_sync, so a request still holds its worker
+    for the whole call; the thread offload only frees the loop when served over ASGI.
+    """
+    try:
+        uploaded_file_obj = await UploadedExcelFile.objects.aget(id=file_id)
         
-        return JsonResponse({
-            'file_id': str(file_id),
-            'products': products_data,
-            'processed_at': datetime.utcnow().isoformat() + 'Z'
-        })
+        # Try to get processed Excel file from workflow4
+        latest_file = await sync_to_async(latest_processed_file)(file_id)
+        
+        # The response only changes when a newer processed file appears
+        latest_name = latest_file.name if latest_file is not None else '-'
+        cache_key = f"chart:{file_id}:{latest_name}:{_file_version(latest_file)}"
+        
+        return await _json_response(
+            request, cache_key,
+            lambda: sync_to_async(_chart_body)(file_id, uploaded_file_obj, latest_file),
+        )
         
     except UploadedExcelFile.DoesNotExist:
         return JsonResponse({'error': 'File not found'}, status=404)
@@ -912,64 +1084,74 @@ def get_chart_data(request, file_id):
         return JsonResponse({'error': f'An error occurred: {str(exc)}'}, status=500)
 
 
-def strict_extract_excel(request, file_id):
+def _strict_payload(file_path):
+    """JSON body of strict_extract_excel for the uploaded workbook at file_path."""
+    # Lazy import to prevent startup crashes
+    from .universal_extractor import UniversalDataExtractor
+    from .chart_data_builder import ChartDataBuilder
+    
+    # Use Universal Extractor
+    extractor = UniversalDataExtractor(file_path)
+    extracted_data = extractor.extract()
+    
+    # Build chart data
+    chart_builder = ChartDataBuilder()
+    chart_data = chart_builder.build_chart_data(extracted_data)
+    
+    # Build response with clean structure
+    result = {
+        'error': False,
+        'products': {},
+        'overall': {
+            'months': chart_data['overall']['months'],
+            'historical': chart_data['overall']['historical'],
+            'predicted': chart_data['overall']['predicted']
+        },
+        'summary': {
+            'products': len(chart_data['products']),
+            'total_forecast': sum(chart_data['overall']['predicted']) if chart_data['overall']['predicted'] else 0.0,
+            'total_raw_material': sum(chart_data['overall']['historical']) if chart_data['overall']['historical'] else 0.0
+        }
+    }
+    
+    # Convert products to array format for response
+    products_array = []
+    for product_code, product_data in chart_data['products'].items():
+        products_array.append(ChartProduct(
+            product_code=product_code,
+            sheet_name='Main Sheet',
+            # ChartDataBuilder already returns plain floats
+            historical=[
+                {'month': month, 'value': value}
+                for month, value in zip(product_data['months'], product_data['historical'])
+            ],
+            predicted=[
+                {'month': month, 'value': value}
+                for month, value in zip(product_data.get('predicted_months', []), product_data['predicted'])
+            ]
+        ))
+    
+    result['products'] = products_array
+    return dumps_json(result)
+
+
+async def strict_extract_excel(request, file_id):
     """
     STRICT Excel extraction endpoint.
     Returns EXACT values from Excel with NO assumptions.
     Uses Universal Extractor to get clean data with pure float values.
+    Extraction and JSON encoding run through sync_to_async. Under the gunicorn WSGI
+    deployment the request still holds its worker for the whole call.
     """
     try:
-        # Lazy import to prevent startup crashes
-        from .universal_extractor import UniversalDataExtractor
-        from .chart_data_builder import ChartDataBuilder
-        
-        uploaded_file_obj = UploadedExcelFile.objects.get(id=file_id)
+        uploaded_file_obj = await UploadedExcelFile.objects.aget(id=file_id)
         file_path = uploaded_file_obj.file.path
         
-        # Use Universal Extractor
-        extractor = UniversalDataExtractor(file_path)
-        extracted_data = extractor.extract()
-        
-        # Build chart data
-        chart_builder = ChartDataBuilder()
-        chart_data = chart_builder.build_chart_data(extracted_data)
-        
-        # Build response with clean structure
-        result = {
-            'error': False,
-            'products': {},
-            'overall': {
-                'months': chart_data['overall']['months'],
-                'historical': chart_data['overall']['historical'],
-                'predicted': chart_data['overall']['predicted']
-            },
-            'summary': {
-                'products': len(chart_data['products']),
-                'total_forecast': sum(chart_data['overall']['predicted']) if chart_data['overall']['predicted'] else 0.0,
-                'total_raw_material': sum(chart_data['overall']['historical']) if chart_data['overall']['historical'] else 0.0
-            }
-        }
-        
-        # Convert products to array format for response
-        products_array = []
-        for product_code, product_data in chart_data['products'].items():
-            products_array.append({
-                'product_code': product_code,
-                'sheet_name': 'Main Sheet',
-                'historical': [
-                    {'month': month, 'value': float(value)}
-                    for month, value in zip(product_data['months'], product_data['historical'])
-                ],
-                'predicted': [
-                    {'month': month, 'value': float(value)}
-                    for month, value in zip(product_data.get('predicted_months', []), product_data['predicted'])
-                ]
-            })
-        
-        result['products'] = products_array
+        # The extraction only depends on the uploaded file
+        cache_key = f"strict:{file_id}:{_file_version(file_path)}"
         
         # Return JSON response with clean dataset
-        return JsonResponse(result, json_dumps_params={'ensure_ascii': False})
+        return await _json_response(request, cache_key, lambda: sync_to_async(_strict_payload)(file_path))
         
     except UploadedExcelFile.DoesNotExist:
         return JsonResponse({
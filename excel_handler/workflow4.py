@@ -3,18 +3,26 @@ from __future__ import annotations
 import io
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 from openpyxl import load_workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt  # noqa: E402
+# Figures are built with the object-oriented API (no pyplot global state) and
+# rendered through the Agg canvas
+from matplotlib.figure import Figure
 import numpy as np
 import pandas as pd
 
+from .universal_extractor import EXCEL_READ_ENGINE, load_sheets
+
+# Stream the consolidated workbook through xlsxwriter when it is installed
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
 MONTH_NAMES = [
     "January",
     "February",
@@ -29,6 +37,7 @@ MONTH_NAMES = [
     "November",
     "December",
 ]
+MONTH_INDEX: Dict[str, int] = {name: idx for idx, name in enumerate(MONTH_NAMES, start=1)}
 
 MONTH_VARIANTS: Dict[str, int] = {
     "jan": 1,
@@ -77,6 +86,9 @@ MONTH_VARIANTS: Dict[str, int] = {
     "december": 12,
     "12": 12,
 }
+MONTH_LOOKUP: Dict[str, str] = {
+    variant: MONTH_NAMES[idx - 1] for variant, idx in MONTH_VARIANTS.items()
+}
 
 PRODUCT_KEYS = [
     "product",
@@ -101,6 +113,14 @@ CONSUMPTION_KEYS = [
 ]
 
 DEFAULT_WINDOW = 3
+CHART_DPI = 100
+
+# Shared cell styles for the Workflow 4 sheets (built once, assigned to every cell)
+HEADER_FONT = Font(bold=True, size=11, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+DATA_ALIGNMENT = Alignment(horizontal="right", vertical="center")
+LABEL_ALIGNMENT = Alignment(horizontal="left", vertical="center")
 
 
 @dataclass
@@ -131,17 +151,17 @@ def run_workflow4_pipeline(
         charts_dir: Directory to save generated charts
         original_file_path: Optional path to original file for writing back results
     """
-    # Handle both file-like objects and file paths
+    # Handle both file-like objects and file paths; paths go through the shared
+    # sheet cache so re-running the workflows on an unchanged upload skips parsing
     if isinstance(uploaded_file, (str, Path)):
-        file_path = Path(uploaded_file)
-        workbook = pd.ExcelFile(file_path)
+        sheets = load_sheets(str(uploaded_file), header=0)
     else:
         file_bytes = uploaded_file.read()
         uploaded_file.seek(0)
-        workbook = pd.ExcelFile(io.BytesIO(file_bytes))
+        sheets = pd.read_excel(io.BytesIO(file_bytes), sheet_name=None, engine=EXCEL_READ_ENGINE)
     
-    base_sheet = workbook.parse(workbook.sheet_names[0])
-    workflow_outputs = _collect_workflow_outputs(workbook)
+    base_sheet = next(iter(sheets.values()))
+    workflow_outputs = _collect_workflow_outputs(sheets)
     normalized = _normalize_input_dataframe(base_sheet)
     forecast_table, demand_trend, method_map = _build_forecast_tables(normalized)
     workflow_outputs["Workflow 4"] = forecast_table
@@ -163,11 +183,11 @@ def run_workflow4_pipeline(
     )
 
 
-def _collect_workflow_outputs(workbook: pd.ExcelFile) -> Dict[str, pd.DataFrame]:
+def _collect_workflow_outputs(sheets: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
     outputs: Dict[str, pd.DataFrame] = {}
-    for sheet in workbook.sheet_names:
+    for sheet, frame in sheets.items():
         if "workflow" in sheet.lower():
-            outputs[sheet] = workbook.parse(sheet)
+            outputs[sheet] = frame
     for idx in range(1, 4):
         label = f"Workflow {idx}"
         outputs.setdefault(label, pd.DataFrame({"Info": ["No data provided"]}))
@@ -175,7 +195,9 @@ def _collect_workflow_outputs(workbook: pd.ExcelFile) -> Dict[str, pd.DataFrame]
 
 
 def _normalize_input_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    frame = df.copy()
+    # Shallow copy: the column labels are replaced below, the data is only read. df can be
+    # a frame shared through the load_sheets cache, so it must not be modified in place
+    frame = df.copy(deep=False)
     frame.columns = [str(col).strip() for col in frame.columns]
     product_col = _find_column(frame, PRODUCT_KEYS) or frame.columns[0]
     month_col = _find_column(frame, MONTH_KEYS)
@@ -196,8 +218,8 @@ def _normalize_input_dataframe(df: pd.DataFrame) -> pd.DataFrame:
             .copy()
         )
         normalized["product"] = normalized["product"].astype(str).str.strip()
-        normalized["month"] = normalized["month"].apply(
-            lambda value: _canonical_month(value) or value
+        normalized["month"] = _canonical_months(normalized["month"]).fillna(
+            normalized["month"]
         )
         normalized["demand"] = pd.to_numeric(normalized["demand"], errors="coerce")
         normalized["per_unit_consumption"] = pd.to_numeric(
@@ -218,33 +240,42 @@ def _normalize_input_dataframe(df: pd.DataFrame) -> pd.DataFrame:
             "Could not detect any monthly columns. Ensure headers or the first few "
             "rows include month names (e.g., April, 11月, etc.)."
         )
-    records: List[Dict[str, object]] = []
-    for _, row in frame.iterrows():
-        product_value = row.get(product_col)
-        if pd.isna(product_value):
-            continue
-        product_text = str(product_value).strip()
-        if not product_text or _canonical_month(product_text):
-            continue  # skip rows that only hold month labels
-        per_unit_value = row.get(consumption_col)
-        for column, canonical_month in month_columns.items():
-            cell_value = row.get(column)
-            if pd.isna(cell_value):
-                continue
-            if isinstance(cell_value, str) and _canonical_month(cell_value):
-                continue
-            numeric_value = _coerce_number(cell_value)
-            if numeric_value is None:
-                continue
-            records.append(
-                {
-                    "product": product_text,
-                    "month": canonical_month,
-                    "demand": numeric_value,
-                    "per_unit_consumption": per_unit_value,
-                }
-            )
-    long_df = pd.DataFrame(records)
+    # Drop rows without a product, or that only hold month labels, before touching any cell
+    product_values = frame[product_col]
+    product_text = product_values.astype(str).str.strip()
+    product_rows = (
+        product_values.notna() & product_text.ne("") & ~_month_like(product_text)
+    ).to_numpy()
+    frame = frame[product_rows]
+    product_text = product_text[product_rows]
+    # Long form, one entry per (row, month column) cell in row-major order
+    month_cols = list(month_columns)
+    n_rows, n_months = len(frame), len(month_cols)
+    cells = pd.Series(frame[month_cols].to_numpy(dtype=object).ravel(), dtype=object)
+    is_text = cells.map(type).eq(str)
+    demand = pd.to_numeric(cells.mask(is_text), errors="coerce")
+    if is_text.any():
+        demand[is_text] = pd.to_numeric(
+            cells[is_text].str.replace(",", "", regex=False), errors="coerce"
+        )
+        # float() accepts spellings to_numeric rejects, e.g. full-width "１２" or "1_000"
+        rejected = is_text & demand.isna()
+        if rejected.any():
+            demand[rejected] = cells[rejected].map(_text_to_float)
+        # Only text that parsed as a number can still be a month label (e.g. "4")
+        numeric_text = is_text & demand.notna()
+        demand[numeric_text & _month_like(cells.where(numeric_text))] = np.nan
+    keep = demand.notna().to_numpy()
+    long_df = pd.DataFrame(
+        {
+            "product": np.repeat(product_text.to_numpy(dtype=object), n_months)[keep],
+            "month": np.tile(np.array(list(month_columns.values()), dtype=object), n_rows)[keep],
+            "demand": demand.to_numpy(dtype=np.float64)[keep],
+            "per_unit_consumption": np.repeat(
+                frame[consumption_col].to_numpy(dtype=object), n_months
+            )[keep],
+        }
+    )
     if long_df.empty:
         raise ValueError(
             "No monthly demand values could be parsed from the supplied sheet."
@@ -290,79 +321,55 @@ def _build_forecast_tables(
     Build forecast tables using 3-month moving average for next-month prediction.
     Implements proper stock usage forecasting with business logic.
     """
-    records: List[Dict[str, object]] = []
-    trend_frames: List[pd.DataFrame] = []
-    methods: Dict[str, str] = {}
+    cleaned = (
+        df.dropna(subset=["demand"])
+        .assign(month_index=lambda d: _month_indices(d["month"]))
+        .dropna(subset=["month_index"])
+        .sort_values(["product", "month_index"], kind="stable")
+    )
+    if cleaned.empty:
+        raise ValueError("Forecast table is empty. Please provide historical demand.")
     
-    for product, group in df.groupby("product"):
-        cleaned = (
-            group.dropna(subset=["demand"])
-            .copy()
-            .assign(month_index=lambda g: g["month"].apply(_month_index))
-            .dropna(subset=["month_index"])
-            .sort_values("month_index")
-        )
-        if cleaned.empty:
-            continue
-        
-        trend_frames.append(
-            cleaned[["month", "demand"]].assign(product=product).reset_index(drop=True)
-        )
-        
-        demand_series = cleaned["demand"].values
-        month_indices = cleaned["month_index"].values
-        
-        # Calculate next-month forecast using 3-month moving average
-        if len(demand_series) >= window:
-            # Use the last 3 months for moving average
-            forecast_value = float(np.mean(demand_series[-window:]))
-            method = f"{window}-month moving average"
-        elif len(demand_series) >= 2:
-            # If less than 3 months, use available data
-            forecast_value = float(np.mean(demand_series))
-            method = f"{len(demand_series)}-month average"
-        else:
-            # Single data point or insufficient data
-            forecast_value = float(demand_series[-1]) if len(demand_series) > 0 else 0.0
-            method = "single period or insufficient data"
-        
-        # Ensure forecast is non-negative
-        forecast_value = max(0.0, forecast_value)
-        
-        per_unit_series = cleaned["per_unit_consumption"].dropna()
-        if per_unit_series.empty:
-            raise ValueError(
-                f"Missing per-unit consumption values for product '{product}'."
-            )
-        per_unit_value = float(per_unit_series.iloc[-1])
-        
-        # Calculate raw material needed
-        raw_material_needed = forecast_value * per_unit_value
-        
-        records.append(
-            {
-                "Product": product,
-                "Forecast Demand": round(forecast_value, 2),
-                "Per Unit Consumption": round(per_unit_value, 4),
-                "Raw Material Needed": round(raw_material_needed, 2),
-            }
+    by_product = cleaned.groupby("product")
+    counts = by_product.size()
+    
+    # Next-month forecast: mean of the last `window` months (or of all months when
+    # fewer are available), never negative
+    forecast = (
+        by_product.tail(window).groupby("product")["demand"].mean().clip(lower=0.0)
+    )
+    
+    # Latest per-unit consumption of each product
+    per_unit = by_product["per_unit_consumption"].last()
+    missing = per_unit.index[per_unit.isna()]
+    if len(missing):
+        raise ValueError(
+            f"Missing per-unit consumption values for product '{missing[0]}'."
         )
-        methods[product] = method
     
-    forecast_table = pd.DataFrame(records)
-    if forecast_table.empty:
-        raise ValueError("Forecast table is empty. Please provide historical demand.")
+    # Calculate raw material needed
+    raw_material_needed = forecast * per_unit
     
-    demand_trend = (
-        pd.concat(trend_frames, ignore_index=True)
-        if trend_frames
-        else pd.DataFrame(columns=["month", "demand", "product"])
+    forecast_table = pd.DataFrame(
+        {
+            "Product": counts.index.to_numpy(),
+            "Forecast Demand": forecast.round(2).to_numpy(),
+            "Per Unit Consumption": per_unit.round(4).to_numpy(),
+            "Raw Material Needed": raw_material_needed.round(2).to_numpy(),
+        }
     )
-    if not demand_trend.empty:
-        demand_trend["month_index"] = demand_trend["month"].apply(_month_index)
-        demand_trend = demand_trend.dropna(subset=["month_index"]).sort_values(
-            "month_index"
+    methods: Dict[str, str] = {
+        product: (
+            f"{window}-month moving average" if count >= window
+            else f"{count}-month average" if count >= 2
+            else "single period or insufficient data"
         )
+        for product, count in counts.items()
+    }
+    
+    demand_trend = cleaned[["month", "demand", "product", "month_index"]].sort_values(
+        "month_index", kind="stable"
+    )
     
     return forecast_table, demand_trend.reset_index(drop=True), methods
 
@@ -400,29 +407,19 @@ def _write_final_excel(
                     # Write headers
                     for col_idx, col_name in enumerate(df.columns, start=1):
                         cell = ws.cell(row=1, column=col_idx, value=col_name)
-                        cell.font = Font(bold=True, size=11)
-                        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                        cell.font = Font(bold=True, size=11, color="FFFFFF")
-                        cell.alignment = Alignment(horizontal="center", vertical="center")
+                        cell.font = HEADER_FONT
+                        cell.fill = HEADER_FILL
+                        cell.alignment = HEADER_ALIGNMENT
                     
                     # Write data
                     for row_idx, (_, row) in enumerate(df.iterrows(), start=2):
                         for col_idx, value in enumerate(row, start=1):
                             cell = ws.cell(row=row_idx, column=col_idx, value=value)
-                            cell.alignment = Alignment(horizontal="right", vertical="center")
+                            cell.alignment = DATA_ALIGNMENT
                     
                     # Auto-adjust column widths
-                    for col_idx in range(1, len(df.columns) + 1):
-                        col_letter = get_column_letter(col_idx)
-                        max_length = 0
-                        for row in ws[col_letter]:
-                            try:
-                                if len(str(row.value)) > max_length:
-                                    max_length = len(str(row.value))
-                            except:
-                                pass
-                        adjusted_width = min(max_length + 2, 50)
-                        ws.column_dimensions[col_letter].width = adjusted_width
+                    for col_idx, width in enumerate(_column_widths(df), start=1):
+                        ws.column_dimensions[get_column_letter(col_idx)].width = width
             
             wb.save(target_path)
             wb.close()
@@ -431,6 +428,10 @@ def _write_final_excel(
             # Fall back to pandas ExcelWriter if openpyxl operations fail
             pass
     
+    if xlsxwriter is not None:
+        _stream_sheets_to_xlsx(workflow_outputs, target_path)
+        return target_path
+    
     # Default: Use pandas ExcelWriter with formatting
     with pd.ExcelWriter(target_path, engine="openpyxl") as writer:
         for sheet_name, data in workflow_outputs.items():
@@ -442,37 +443,67 @@ def _write_final_excel(
             worksheet = writer.sheets[sheet_name[:31]]
             
             # Format header row
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            header_font = Font(bold=True, size=11, color="FFFFFF")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            
             for cell in worksheet[1]:
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = header_alignment
+                cell.fill = HEADER_FILL
+                cell.font = HEADER_FONT
+                cell.alignment = HEADER_ALIGNMENT
             
             # Format data cells
-            data_alignment = Alignment(horizontal="right", vertical="center")
             for row in worksheet.iter_rows(min_row=2, max_row=worksheet.max_row):
                 for cell in row:
-                    cell.alignment = data_alignment
+                    cell.alignment = DATA_ALIGNMENT
             
             # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if cell.value:
-                            max_length = max(max_length, len(str(cell.value)))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+            for col_idx, width in enumerate(_column_widths(sheet_df), start=1):
+                worksheet.column_dimensions[get_column_letter(col_idx)].width = width
     
     return target_path
 
 
+def _stream_sheets_to_xlsx(workflow_outputs: Dict[str, pd.DataFrame], target_path: Path) -> None:
+    """
+    Write each workflow output to its own sheet with xlsxwriter, row by row in constant
+    memory, using the same header styling, right-aligned data and auto widths as the
+    openpyxl path.
+    """
+    workbook = xlsxwriter.Workbook(str(target_path), {
+        "constant_memory": True,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+        "default_date_format": "yyyy-mm-dd hh:mm:ss",
+    })
+    header_format = workbook.add_format({
+        "bold": True,
+        "font_size": 11,
+        "font_color": "#FFFFFF",
+        "bg_color": "#366092",
+        "align": "center",
+        "valign": "vcenter",
+    })
+    data_format = workbook.add_format({"align": "right", "valign": "vcenter"})
+    for sheet_name, data in workflow_outputs.items():
+        sheet_df = data if not data.empty else pd.DataFrame({"Info": ["No data"]})
+        worksheet = workbook.add_worksheet(sheet_name[:31])
+        for col_idx, width in enumerate(_column_widths(sheet_df)):
+            worksheet.set_column(col_idx, col_idx, width, data_format)
+        worksheet.write_row(0, 0, [str(column) for column in sheet_df.columns], header_format)
+        # Plain Python values with missing cells as None (written as blanks)
+        values = sheet_df.astype(object).where(sheet_df.notna(), None)
+        for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+            worksheet.write_row(row_idx, 0, row)
+    workbook.close()
+
+
+def _column_widths(df: pd.DataFrame, max_width: int = 50) -> List[int]:
+    """Auto-fit width of each column: its longest header or value text plus 2, capped."""
+    widths = []
+    for col_idx, column in enumerate(df.columns):
+        values = df.iloc[:, col_idx].dropna()
+        longest = int(values.astype(str).str.len().max()) if len(values) else 0
+        widths.append(min(max(len(str(column)), longest) + 2, max_width))
+    return widths
+
+
 def write_results_to_original_excel(
     original_file_path: Path,
     forecast_table: pd.DataFrame,
@@ -494,9 +525,9 @@ def write_results_to_original_excel(
         headers = ["Product", "Forecast Demand", "Per Unit Consumption", "Raw Material Needed"]
         for col_idx, header in enumerate(headers, start=1):
             cell = ws.cell(row=1, column=col_idx, value=header)
-            cell.font = Font(bold=True, size=11, color="FFFFFF")
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            cell.alignment = HEADER_ALIGNMENT
         
         # Write data rows
         for row_idx, (_, row) in enumerate(forecast_table.iterrows(), start=2):
@@ -508,18 +539,12 @@ def write_results_to_original_excel(
             # Format data cells
             for col_idx in range(1, 5):
                 cell = ws.cell(row=row_idx, column=col_idx)
-                cell.alignment = Alignment(horizontal="right" if col_idx > 1 else "left", vertical="center")
+                cell.alignment = DATA_ALIGNMENT if col_idx > 1 else LABEL_ALIGNMENT
         
         # Auto-adjust column widths
         from openpyxl.utils import get_column_letter
-        for col_idx in range(1, 5):
-            col_letter = get_column_letter(col_idx)
-            max_length = len(headers[col_idx - 1])
-            for row in ws.iter_rows(min_row=2, max_row=ws.max_row, min_col=col_idx, max_col=col_idx):
-                for cell in row:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-            ws.column_dimensions[col_letter].width = min(max_length + 2, 50)
+        for col_idx, width in enumerate(_column_widths(forecast_table[headers]), start=1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
         
         wb.save(output_path)
         wb.close()
@@ -538,41 +563,39 @@ def _generate_charts(
     demand_chart_path = charts_dir / "demand_plot.png"
     raw_chart_path = charts_dir / "raw_material_plot.png"
     if not demand_trend.empty:
-        agg_trend = (
-            demand_trend.groupby("month", as_index=False)["demand"]
-            .sum()
-            .assign(month_index=lambda df: df["month"].apply(_month_index))
-            .dropna(subset=["month_index"])
-            .sort_values("month_index")
-        )
-        plt.figure(figsize=(10, 4))
-        plt.plot(agg_trend["month"], agg_trend["demand"], marker="o", linewidth=2)
-        plt.title("Monthly Demand Trend")
-        plt.xlabel("Month")
-        plt.ylabel("Units")
-        plt.grid(True, linestyle="--", alpha=0.3)
-        plt.tight_layout()
-        plt.savefig(demand_chart_path, dpi=150)
-        plt.close()
+        # _build_forecast_tables already resolved month_index for every row
+        monthly_demand = demand_trend.groupby("month_index", sort=True)["demand"].sum()
+        months = [MONTH_NAMES[int(idx) - 1] for idx in monthly_demand.index]
+        fig = Figure(figsize=(10, 4))
+        ax = fig.subplots()
+        ax.plot(months, monthly_demand.to_numpy(), marker="o", linewidth=2)
+        ax.set_title("Monthly Demand Trend")
+        ax.set_xlabel("Month")
+        ax.set_ylabel("Units")
+        ax.grid(True, linestyle="--", alpha=0.3)
+        fig.subplots_adjust(left=0.08, right=0.98, top=0.9, bottom=0.15)
     else:
-        plt.figure(figsize=(10, 4))
-        plt.text(0.5, 0.5, "No demand data", ha="center", va="center")
-        plt.axis("off")
-        plt.savefig(demand_chart_path, dpi=150)
-        plt.close()
-    plt.figure(figsize=(8, 4))
-    plt.bar(
+        fig = Figure(figsize=(10, 4))
+        ax = fig.subplots()
+        ax.text(0.5, 0.5, "No demand data", ha="center", va="center")
+        ax.axis("off")
+    fig.savefig(demand_chart_path, dpi=CHART_DPI)
+    
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.bar(
         raw_material_table["Product"],
         raw_material_table["Raw Material Needed"],
         color="#4e79a7",
     )
-    plt.title("Raw Material Requirement by Product")
-    plt.xlabel("Product")
-    plt.ylabel("Raw Material Needed")
-    plt.xticks(rotation=45, ha="right")
-    plt.tight_layout()
-    plt.savefig(raw_chart_path, dpi=150)
-    plt.close()
+    ax.set_title("Raw Material Requirement by Product")
+    ax.set_xlabel("Product")
+    ax.set_ylabel("Raw Material Needed")
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    fig.subplots_adjust(left=0.1, right=0.98, top=0.9, bottom=0.3)
+    fig.savefig(raw_chart_path, dpi=CHART_DPI)
     return {
         "demand": f"charts/{demand_chart_path.name}",
         "raw_material": f"charts/{raw_chart_path.name}",
@@ -580,22 +603,31 @@ def _generate_charts(
 
 
 def _find_column(df: pd.DataFrame, candidates: Iterable[str]) -> Optional[str]:
-    lowered = {candidate.lower(): candidate for candidate in candidates}
+    # An exact (case-insensitive) match is also a substring match, so one check covers both
+    lowered = tuple(candidate.lower() for candidate in candidates)
     for column in df.columns:
-        col_value = str(column).strip()
-        col_lower = col_value.lower()
-        if col_lower in lowered:
+        col_lower = str(column).strip().lower()
+        if any(candidate in col_lower for candidate in lowered):
             return column
-        for candidate in candidates:
-            if candidate.lower() in col_lower:
-                return column
     return None
 
 
+def _text_to_float(text: str) -> float:
+    try:
+        return float(text.replace(",", ""))
+    except ValueError:
+        return np.nan
+
+
 def _canonical_month(value) -> Optional[str]:
     if value is None or (isinstance(value, float) and np.isnan(value)):
         return None
-    text = str(value).strip().lower()
+    return _canonical_month_text(str(value))
+
+
+@lru_cache(maxsize=256)
+def _canonical_month_text(text: str) -> Optional[str]:
+    text = text.strip().lower()
     if not text:
         return None
     if text.endswith("月"):
@@ -611,20 +643,26 @@ def _canonical_month(value) -> Optional[str]:
     return None
 
 
-def _month_index(value) -> Optional[int]:
-    canonical = _canonical_month(value)
-    if canonical is None:
-        return None
-    return MONTH_NAMES.index(canonical) + 1
+def _canonical_months(values: pd.Series) -> pd.Series:
+    """Vectorized _canonical_month: the canonical month name of each value, NaN if none."""
+    text = values.astype(str).str.strip().str.lower()
+    text = text.mask(text.str.endswith("月"), text.str.replace("月", "", regex=False))
+    text = text.str.replace(".", "", regex=False)
+    months = text.map(MONTH_LOOKUP)
+    # Digit-only spellings the table does not list, e.g. "004" or full-width "４",
+    # go through the scalar int() range check
+    digits = months.isna() & text.str.isdigit()
+    if digits.any():
+        months = months.mask(digits, text[digits].map(_canonical_month_text))
+    return months
 
 
-def _coerce_number(value) -> Optional[float]:
-    if value is None:
-        return None
-    if isinstance(value, (int, float, np.number)):
-        return float(value)
-    try:
-        return float(str(value).replace(",", ""))
-    except ValueError:
-        return None
+def _month_like(values: pd.Series) -> pd.Series:
+    """Mask of the values _canonical_month recognizes."""
+    return _canonical_months(values).notna()
+
+
+def _month_indices(values: pd.Series) -> pd.Series:
+    """Month number (1-12) of each value, NaN where it is not a month."""
+    return _canonical_months(values).map(MONTH_INDEX)
 